@@ -0,0 +1,202 @@
+from deepface import DeepFace
+import cv2
+import numpy as np
+import threading
+from collections import defaultdict
+
+# DeepFace Emotion 모델 출력 순서
+EMOTION_LABELS = ["angry", "disgust", "fear", "happy", "sad", "surprise", "neutral"]
+EMOTION_INPUT_SIZE = 48  # 감정 CNN 입력: (48, 48, 1) 흑백
+
+_classifier = None
+_classifier_lock = threading.Lock()
+
+
+def get_emotion_classifier():
+    """DeepFace 감정 CNN (프로세스당 1회 생성)"""
+    global _classifier
+    if _classifier is None:
+        with _classifier_lock:
+            if _classifier is None:
+                _classifier = DeepFace.build_model("Emotion")
+    return _classifier
+
+
+def warmup(detector_backend: str):
+    """
+    서버 시작 시 모델을 미리 생성하고 더미 입력으로 한 번씩 실행
+    - DeepFace는 첫 호출에서 검출기/감정 모델을 만들기 때문에 첫 요청이 수 초씩 느려지는 것을 방지
+    """
+    get_emotion_classifier()
+    dummy = np.zeros((240, 320, 3), dtype=np.uint8)
+    DeepFace.extract_faces(dummy, detector_backend=detector_backend, enforce_detection=False, align=True)
+    classify_faces(np.zeros((1, EMOTION_INPUT_SIZE, EMOTION_INPUT_SIZE), dtype=np.float32))
+
+
+def detect_face(frame, detector_backend: str):
+    """
+    프레임 하나에서 얼굴 검출 → (얼굴 crop(RGB, 0~1), facial_area, confidence) 또는 None
+    - DeepFace.analyze(enforce_detection=False)와 같은 규칙: 얼굴이 없으면 프레임 전체를 얼굴로 사용(confidence 0)
+    - 여러 명이면 첫 번째 얼굴만 사용 (기존 result[0]과 동일)
+    """
+    faces = DeepFace.extract_faces(
+        frame,
+        detector_backend=detector_backend,
+        enforce_detection=False,
+        align=True,
+    )
+    if not faces:
+        return None
+    face = faces[0]
+    if face["face"].shape[0] == 0 or face["face"].shape[1] == 0:
+        return None
+    return face["face"], face["facial_area"], face.get("confidence") or 0.0
+
+
+class FaceTracker:
+    """
+    검출 후 추적: 면접 영상은 얼굴 하나가 거의 고정이라 매 샘플마다 검출기(MTCNN 등)를 돌릴 필요가 없음
+    - 검출 성공 시 얼굴 영역(흑백)을 템플릿으로 저장
+    - 다음 샘플부터는 이전 위치 주변(search_margin)에서 matchTemplate으로 위치만 갱신해 crop
+    - 매칭 점수가 min_score 미만이거나 redetect_every번 추적했으면 다시 전체 검출
+    - 추적 프레임은 눈 기준 정렬(align)을 생략 (검출 직후 위치/크기 그대로 사용)
+    """
+
+    def __init__(self, detector_backend: str, redetect_every: int = 5, min_score: float = 0.6, search_margin: float = 0.5):
+        self.detector_backend = detector_backend
+        self.redetect_every = redetect_every
+        self.min_score = min_score
+        self.search_margin = search_margin
+        self.detections = 0
+        self.tracked = 0
+        self.reset()
+
+    def reset(self):
+        self._template = None
+        self._box = None
+        self._since_detect = 0
+
+    def locate(self, frame):
+        """BGR 프레임 → 얼굴 crop(RGB, 0~1) 또는 None"""
+        if self._template is not None and self._since_detect < self.redetect_every:
+            face = self._track(frame)
+            if face is not None:
+                self._since_detect += 1
+                self.tracked += 1
+                return face
+        return self._detect(frame)
+
+    def _detect(self, frame):
+        self.reset()
+        self.detections += 1
+        detected = detect_face(frame, self.detector_backend)
+        if detected is None:
+            return None
+        face, area, confidence = detected
+        x, y, w, h = (int(area.get(k, 0)) for k in ("x", "y", "w", "h"))
+        x, y = max(x, 0), max(y, 0)
+        w, h = min(w, frame.shape[1] - x), min(h, frame.shape[0] - y)
+        if confidence > 0 and w > 1 and h > 1:  # 얼굴을 못 찾아 프레임 전체를 쓴 경우는 추적하지 않음
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            self._template = gray[y:y + h, x:x + w].copy()
+            self._box = (x, y, w, h)
+        return face
+
+    def _track(self, frame):
+        x, y, w, h = self._box
+        mx, my = int(w * self.search_margin), int(h * self.search_margin)
+        x0, y0 = max(x - mx, 0), max(y - my, 0)
+        x1, y1 = min(x + w + mx, frame.shape[1]), min(y + h + my, frame.shape[0])
+        if x1 - x0 < w or y1 - y0 < h:
+            return None
+
+        search = cv2.cvtColor(frame[y0:y1, x0:x1], cv2.COLOR_BGR2GRAY)
+        result = cv2.matchTemplate(search, self._template, cv2.TM_CCOEFF_NORMED)
+        _, score, _, loc = cv2.minMaxLoc(result)
+        if score < self.min_score:
+            return None
+
+        x, y = x0 + loc[0], y0 + loc[1]
+        self._box = (x, y, w, h)
+        return frame[y:y + h, x:x + w, ::-1].astype(np.float32) / 255.0
+
+
+def preprocess_face(face_rgb: np.ndarray) -> np.ndarray:
+    """
+    얼굴 crop(RGB, 0~1) → (48, 48) float32 흑백
+    - DeepFace와 같이 비율 유지 + 검은 여백으로 정사각형을 만든 뒤 축소
+    """
+    face = np.asarray(face_rgb, dtype=np.float32)
+    if face.max() > 1.0:
+        face = face / 255.0
+    h, w = face.shape[:2]
+    side = max(h, w)
+    square = np.zeros((side, side, 3), dtype=np.float32)
+    top, left = (side - h) // 2, (side - w) // 2
+    square[top:top + h, left:left + w] = face
+    gray = cv2.cvtColor(square, cv2.COLOR_RGB2GRAY)
+    return cv2.resize(gray, (EMOTION_INPUT_SIZE, EMOTION_INPUT_SIZE), interpolation=cv2.INTER_AREA)
+
+
+def classify_faces(faces: np.ndarray, batch_size: int = 32) -> np.ndarray:
+    """(B, 48, 48) 얼굴 배치 → (B, 7) 감정별 점수(%) — 감정 CNN을 배치 단위로 한 번에 실행"""
+    if len(faces) == 0:
+        return np.empty((0, len(EMOTION_LABELS)), dtype=np.float32)
+    x = np.asarray(faces, dtype=np.float32)[..., None]  # (B, 48, 48, 1)
+    preds = get_emotion_classifier().model.predict(x, batch_size=batch_size, verbose=0)
+    sums = preds.sum(axis=1, keepdims=True)
+    sums[sums == 0] = 1.0
+    return 100.0 * preds / sums
+
+
+def top2_labels(scores: np.ndarray):
+    """(B, 7) 점수 → [(top1, top2), ...] (점수 내림차순, 동점이면 라벨 순서 유지)"""
+    order = np.argsort(-scores, axis=1, kind="stable")
+    return [(EMOTION_LABELS[row[0]], EMOTION_LABELS[row[1]]) for row in order]
+
+
+def analyze_frames(frames, detector_backend: str, batch_size: int = 32, tracker: FaceTracker = None):
+    """
+    (BGR 프레임, t_sec) 스트림 → per_second_pairs {sec: [(top1, top2), ...]}
+    - 검출은 프레임마다(tracker가 있으면 주기적으로만), 감정 분류는 얼굴을 batch_size개씩 모아서 한 번에
+    - 검출 실패 프레임은 기존처럼 건너뜀, 분류가 실패한 배치는 그 배치의 프레임만 빼고 계속 진행
+    """
+    per_second_pairs = defaultdict(list)
+    pending_faces, pending_secs = [], []
+
+    def flush():
+        if not pending_faces:
+            return
+        try:
+            scores = classify_faces(np.stack(pending_faces), batch_size)
+            for second, pair in zip(pending_secs, top2_labels(scores)):
+                per_second_pairs[second].append(pair)
+        except Exception as e:
+            print("[EMOTION_BATCH_ERR]", f"frames={len(pending_faces)}", str(e))
+        finally:
+            pending_faces.clear()
+            pending_secs.clear()
+
+    for frame, t_sec in frames:
+        try:
+            if tracker is not None:
+                face = tracker.locate(frame)
+            else:
+                detected = detect_face(frame, detector_backend)
+                face = detected[0] if detected is not None else None
+            if face is None:
+                continue
+            face = preprocess_face(face)
+        except Exception:
+            if tracker is not None:
+                tracker.reset()
+            continue
+        pending_faces.append(face)
+        pending_secs.append(int(t_sec))
+        if len(pending_faces) >= batch_size:
+            flush()
+    flush()
+
+    if tracker is not None:
+        print("[FACE_TRACK]", f"detections={tracker.detections} tracked={tracker.tracked}")
+    return per_second_pairs
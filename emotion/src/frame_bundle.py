@@ -0,0 +1,32 @@
+import io
+import cv2
+import numpy as np
+
+# tracking /analyze-all → /analyze-frames 로 넘어오는 샘플 프레임 묶음 (npz, pickle 없음)
+# - timestamps: (N,) float64 초
+# - offsets:    (N+1,) int64 — jpeg[offsets[i]:offsets[i+1]]가 i번째 프레임
+# - jpeg:       (총 바이트,) uint8 — JPEG 인코딩 프레임을 이어 붙인 것
+MAX_BUNDLE_FRAMES = 20000
+
+
+def iter_bundle_frames(data: bytes):
+    """npz 바이트 → (BGR 프레임, t_sec) 제너레이터. 형식이 맞지 않으면 ValueError"""
+    try:
+        with np.load(io.BytesIO(data), allow_pickle=False) as npz:
+            timestamps = npz["timestamps"].astype(np.float64)
+            offsets = npz["offsets"].astype(np.int64)
+            jpeg = npz["jpeg"].astype(np.uint8, copy=False)
+    except (OSError, KeyError, ValueError) as e:
+        raise ValueError(f"프레임 묶음 형식 오류: {e}")
+
+    n = len(timestamps)
+    if n > MAX_BUNDLE_FRAMES or len(offsets) != n + 1 or (n and (offsets[0] != 0 or offsets[-1] != len(jpeg) or np.any(np.diff(offsets) < 0))):
+        raise ValueError("프레임 묶음 형식 오류: offsets/timestamps 불일치")
+
+    def frames():
+        for i in range(n):
+            frame = cv2.imdecode(jpeg[offsets[i]:offsets[i + 1]], cv2.IMREAD_COLOR)
+            if frame is not None:
+                yield frame, float(timestamps[i])
+
+    return frames()
@@ -0,0 +1,29 @@
+import cv2
+
+
+def iter_sampled_frames(cap, sample_fps: float = 3, fallback_fps: float = 30.0):
+    """
+    cv2.VideoCapture → 초당 sample_fps장만 (BGR 프레임, t_sec)로 내보내는 제너레이터
+    - 모든 프레임은 grab()만 하고(압축 해제만, BGR 변환 없음) 샘플 시각이 된 프레임만 retrieve()
+      → 30fps 영상이면 버려지는 90% 프레임의 BGR 변환/복사가 없어짐
+    - t_sec: grab 직후 POS_MSEC 기준, 값이 없으면(0 이하) frame_idx / fallback_fps
+    """
+    frame_interval = 1 / sample_fps
+    prev_timestamp = -frame_interval
+    frame_idx = -1
+
+    while True:
+        if not cap.grab():
+            break
+        frame_idx += 1
+
+        timestamp_ms = cap.get(cv2.CAP_PROP_POS_MSEC)
+        timestamp = timestamp_ms / 1000.0 if timestamp_ms > 0 else frame_idx / fallback_fps
+        if timestamp - prev_timestamp < frame_interval:
+            continue
+
+        ok, frame = cap.retrieve()
+        if not ok or frame is None:
+            break
+        prev_timestamp = timestamp
+        yield frame, timestamp
@@ -1,14 +1,74 @@
-from fastapi import FastAPI, File, UploadFile, Form
-from fastapi.responses import JSONResponse
-from deepface import DeepFace
+from fastapi import FastAPI, File, UploadFile, Form, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 import cv2
 import numpy as np
-from collections import Counter, defaultdict
-import shutil
+from collections import Counter
+from typing import Optional
+from src.result_cache import ResultCache, make_cache_key
+from src.upload import UploadRejected, content_length_exceeded, check_duration, saved_upload
+from src.emotion_pipeline import analyze_frames, FaceTracker, warmup
+from src.frame_sampler import iter_sampled_frames
+from src.frame_bundle import iter_bundle_frames
+from src.executor import BoundedExecutor, Overloaded, render_executor_metrics
+from contextlib import asynccontextmanager
+import asyncio
+import time
 import os
-import uuid
 
-app = FastAPI()
+# 얼굴 검출기 (DeepFace detector_backend: mtcnn, retinaface, opencv, ssd, mediapipe, yunet 등)
+DETECTOR_BACKEND = os.getenv("EMOTION_DETECTOR_BACKEND", "mtcnn")
+
+# 모델 준비 상태 (/healthz)
+readiness = {"ready": False, "error": None}
+
+# 검출/감정 추론 실행기: 동시 실행 수 / 최대 대기 수 (넘으면 503)
+executor = BoundedExecutor(
+    "emotion",
+    int(os.getenv("EMOTION_WORKERS", "1")),
+    int(os.getenv("EMOTION_MAX_QUEUE", "8")),
+)
+
+def _warmup():
+    t0 = time.perf_counter()
+    try:
+        warmup(DETECTOR_BACKEND)
+        readiness["ready"] = True
+        print("[WARMUP]", f"detector={DETECTOR_BACKEND} ready in {time.perf_counter() - t0:.1f}s")
+    except Exception as e:
+        readiness["error"] = str(e)
+        print("[WARMUP_ERR]", str(e))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 검출기/감정 모델 로드 + 더미 추론은 백그라운드에서 → 그동안 /healthz는 503
+    task = asyncio.create_task(asyncio.to_thread(_warmup))
+    yield
+    task.cancel()
+    executor.shutdown()
+
+app = FastAPI(lifespan=lifespan)
+
+@app.middleware("http")
+async def reject_oversized_upload(request: Request, call_next):
+    # Content-Length가 제한을 넘으면 본문을 받기(멀티파트 파싱) 전에 413
+    if request.method == "POST" and content_length_exceeded(request.headers.get("content-length")):
+        return JSONResponse(content={"error": "업로드 크기 초과"}, status_code=413)
+    return await call_next(request)
+
+# 결과 캐시: 같은 영상 재전송(타임아웃 재시도 등) 시 분석 없이 이전 결과 반환
+# - 메모리 LRU 항목 수(0이면 끔) / 디스크 캐시 디렉터리(미설정이면 메모리만) / 디스크 최대 항목 수
+result_cache = ResultCache(
+    int(os.getenv("EMOTION_CACHE_SIZE", "128")),
+    os.getenv("EMOTION_CACHE_DIR"),
+    int(os.getenv("EMOTION_CACHE_DISK_MAX", "4096")),
+)
+
+SAMPLE_FPS = 3  # 초당 분석 프레임 수
+BATCH_SIZE = int(os.getenv("EMOTION_BATCH_SIZE", "32"))  # 감정 CNN 배치 크기
+# 검출 후 추적: 0(기본)이면 매 샘플 전체 검출 (기존 방식) / N이면 추적 N회마다 재검출 / 추적 매칭 최소 점수
+# 추적 프레임은 정렬(align) 없이 잘라내므로 감정 점수가 기존과 달라질 수 있어 설정했을 때만 사용
+REDETECT_EVERY = int(os.getenv("EMOTION_REDETECT_EVERY", "0"))
+TRACK_MIN_SCORE = float(os.getenv("EMOTION_TRACK_MIN_SCORE", "0.6"))
 
 # (참고) DeepFace 감정 라벨: angry, disgust, fear, happy, sad, surprise, neutral
 
@@ -44,65 +104,58 @@ def sec_to_hhmmss(sec: int) -> str:
 
 @app.get("/healthz")
 def healthz():
-    return {"ok": True}
+    if not readiness["ready"]:
+        return JSONResponse(content={"ok": False, "ready": False, "error": readiness["error"]}, status_code=503)
+    return {"ok": True, "ready": True, "detector": DETECTOR_BACKEND}
 
-@app.post("/analyze")
-async def analyze_emotion(
-    file: UploadFile = File(...),
-    interviewId: str = Form(...),
-    seq: int = Form(...),
-):
-    # 1) 파일 저장
-    temp_filename = f"temp_{uuid.uuid4()}.mp4"
-    with open(temp_filename, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+@app.get("/metrics")
+def metrics():
+    # Prometheus 텍스트 형식 (실행 중/대기 중 작업 수, 거절 수)
+    return PlainTextResponse(render_executor_metrics("emotion", [executor]), media_type="text/plain; version=0.0.4")
 
+def overloaded_response(e: Overloaded):
+    return JSONResponse(content={"error": str(e)}, status_code=503, headers={"Retry-After": "5"})
+
+def analyze_video_file(temp_filename: str):
+    """
+    영상 하나의 표정 분석 → (result, error)
+    - result: score/text/timestamp/meta (interviewId/seq는 호출 측에서 붙임 → 그대로 캐시 가능)
+    """
     # 2) 영상 열기
     cap = cv2.VideoCapture(temp_filename)
     if not cap.isOpened():
-        os.remove(temp_filename)
-        return JSONResponse(content={"error": "영상 열기 실패"}, status_code=400)
+        return None, "영상 열기 실패"
 
     # 총 길이(초) 계산 시도
     fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
     frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0.0
+    # 길이 제한: 컨테이너 메타만 보고 디코딩 전에 거절
+    if fps > 0 and frame_count > 0:
+        try:
+            check_duration(frame_count / fps)
+        except UploadRejected:
+            cap.release()
+            raise
 
-    # 3) 분석(초당 3프레임 샘플링)
-    frame_interval = 1 / 3  # 1초당 3프레임
-    per_second_pairs = defaultdict(list)  # {sec: [(top1, top2), ...]}
-    prev_timestamp = -frame_interval
-
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        timestamp = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
-        if timestamp - prev_timestamp >= frame_interval:
-            prev_timestamp = timestamp
-            second = int(timestamp)
-
-            try:
-                result = DeepFace.analyze(
-                    frame,
-                    actions=["emotion"],
-                    detector_backend="mtcnn",  # 필요 시 retinaface로 교체 가능
-                    enforce_detection=False
-                )
-                emotions = result[0]["emotion"]
-                sorted_emotions = sorted(emotions.items(), key=lambda x: x[1], reverse=True)
-                top1, top2 = sorted_emotions[0][0], sorted_emotions[1][0]
-                per_second_pairs[second].append((top1, top2))
-            except Exception:
-                continue
-
-    # 영상 리소스 정리
-    cap.release()
-    os.remove(temp_filename)
+    # 3) 분석(초당 3프레임 샘플링) → 프레임별 얼굴 검출 + 감정 분류는 배치로
+    try:
+        tracker = FaceTracker(DETECTOR_BACKEND, REDETECT_EVERY, TRACK_MIN_SCORE) if REDETECT_EVERY > 0 else None
+        frames = iter_sampled_frames(cap, SAMPLE_FPS, fps if 0 < fps <= 120 else 30.0)
+        per_second_pairs = analyze_frames(frames, DETECTOR_BACKEND, BATCH_SIZE, tracker)  # {sec: [(top1, top2), ...]}
+    finally:
+        # 영상 리소스 정리
+        cap.release()
 
+    return score_emotions(per_second_pairs, frame_count / fps if fps > 0 and frame_count > 0 else None), None
+
+def score_emotions(per_second_pairs, duration_secs=None):
+    """
+    초별 (top1, top2) 목록 → 점수/설명/감점 시각 (영상 분석과 프레임 묶음 분석 공용)
+    - duration_secs: 영상 길이(초), 모르면 마지막 초 + 1로 추정
+    """
     # fps 정보를 못 얻었을 때 총 길이 추정 (마지막 초 + 1)
-    if fps > 0 and frame_count > 0:
-        duration_seconds = max(1, int(round(frame_count / fps)))
+    if duration_secs:
+        duration_seconds = max(1, int(round(duration_secs)))
     else:
         duration_seconds = max(per_second_pairs.keys(), default=0) + 1
         duration_seconds = max(1, duration_seconds)
@@ -167,8 +220,6 @@ async def analyze_emotion(
         message = f"표정 감지 분석 결과: 감정 인식 실패, 최종 점수는 {final_score}점입니다."
 
     return {
-        "interviewId": interviewId,
-        "seq": seq,
         "score": final_score,
         "text": message,
         "timestamp": penalty_timestamps,
@@ -178,3 +229,62 @@ async def analyze_emotion(
             "rules": PENALTY_RULES
         }
     }
+
+@app.post("/analyze")
+async def analyze_emotion(
+    file: UploadFile = File(...),
+    interviewId: str = Form(...),
+    seq: int = Form(...),
+):
+    try:
+        # 1) 파일 저장 (tmpfs 우선, 저장하면서 내용 해시 계산, 분석 중 예외가 나도 삭제)
+        async with saved_upload(file) as (temp_filename, content_hash):
+            # 같은 영상 + 같은 분석 설정이면 이전 결과 재사용
+            key = make_cache_key(
+                content_hash, detector=DETECTOR_BACKEND, sample_fps=SAMPLE_FPS,
+                redetect_every=REDETECT_EVERY, track_min_score=TRACK_MIN_SCORE,
+            )
+            result = await asyncio.to_thread(result_cache.get, key)
+            if result is not None:
+                print("[CACHE] hit", key[:12])
+            else:
+                # 블로킹 추론은 실행기에서 → 이벤트 루프는 다른 요청/헬스체크에 계속 응답
+                result, error = await executor.run(analyze_video_file, temp_filename)
+                if error:
+                    return JSONResponse(content={"error": error}, status_code=400)
+                await asyncio.to_thread(result_cache.put, key, result)
+    except UploadRejected as e:
+        return JSONResponse(content={"error": str(e)}, status_code=413)
+    except Overloaded as e:
+        return overloaded_response(e)
+
+    return {"interviewId": interviewId, "seq": seq, **result}
+
+@app.post("/analyze-frames")
+async def analyze_emotion_frames(
+    file: UploadFile = File(...),   # tracking /analyze-all이 보낸 샘플 프레임 묶음(npz)
+    interviewId: str = Form(...),
+    seq: int = Form(...),
+    durationSeconds: Optional[float] = Form(None),   # 원본 영상 길이(초), 없으면 마지막 프레임 기준 추정
+):
+    # 영상 디코딩/샘플링은 tracking 쪽에서 끝났으므로 검출 + 감정 분류만 (npz 파싱도 실행기에서)
+    try:
+        result, error = await executor.run(analyze_frame_bundle, await file.read(), durationSeconds)
+    except Overloaded as e:
+        return overloaded_response(e)
+    if error:
+        return JSONResponse(content={"error": error}, status_code=400)
+    return {"interviewId": interviewId, "seq": seq, **result}
+
+def analyze_frame_bundle(data: bytes, duration_secs=None):
+    """프레임 묶음(npz) 하나의 표정 분석 → (result, error)"""
+    try:
+        frames = iter_bundle_frames(data)
+    except ValueError as e:
+        return None, str(e)
+    return analyze_frame_stream(frames, duration_secs), None
+
+def analyze_frame_stream(frames, duration_secs=None):
+    tracker = FaceTracker(DETECTOR_BACKEND, REDETECT_EVERY, TRACK_MIN_SCORE) if REDETECT_EVERY > 0 else None
+    per_second_pairs = analyze_frames(frames, DETECTOR_BACKEND, BATCH_SIZE, tracker)
+    return score_emotions(per_second_pairs, duration_secs)
@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Optional
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def make_cache_key(content_hash: str, **params) -> str:
+    """업로드 내용 해시 + 분석 파라미터 → 캐시 키 (파라미터가 다르면 다른 결과로 취급)"""
+    payload = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(f"{content_hash}:{payload}".encode("utf-8")).hexdigest()
+
+
+def copy_and_hash(src, dst, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """파일 객체 src → dst로 복사하면서 sha256을 같이 계산 (업로드를 한 번만 읽음)"""
+    hasher = hashlib.sha256()
+    while True:
+        chunk = src.read(chunk_size)
+        if not chunk:
+            break
+        hasher.update(chunk)
+        dst.write(chunk)
+    return hasher.hexdigest()
+
+
+class ResultCache:
+    """
+    분석 결과 캐시 (키: make_cache_key)
+    - 메모리: OrderedDict LRU, max_entries 초과 시 가장 오래 안 쓴 항목부터 제거 (0이면 캐시 끔)
+    - 디스크(선택): disk_dir/<key>.json, disk_max_entries 초과 시 수정 시각이 오래된 파일부터 제거
+      → 재시작/다른 워커 프로세스에서도 재사용. 메모리에 없으면 디스크에서 읽어 메모리로 올림
+    - 값은 JSON 직렬화 가능한 dict (interviewId/seq 같은 요청 정보는 넣지 않음)
+    """
+
+    def __init__(self, max_entries: int = 128, disk_dir: Optional[str] = None, disk_max_entries: int = 4096):
+        self.max_entries = max(int(max_entries), 0)
+        self.disk_dir = disk_dir or None
+        self.disk_max_entries = max(int(disk_max_entries), 1)
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key: str) -> Optional[dict]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                return value
+        value = self._read_disk(key)
+        if value is not None:
+            self._put_memory(key, value)
+        return value
+
+    def put(self, key: str, value: dict):
+        if not self.enabled:
+            return
+        self._put_memory(key, value)
+        self._write_disk(key, value)
+
+    def _put_memory(self, key, value):
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path)  # 디스크 쪽도 최근 사용 순서 유지
+            return value
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key, value):
+        if not self.disk_dir:
+            return
+        tmp_path = self._disk_path(f"{key}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(tmp_path, self._disk_path(key))  # 동시에 읽는 쪽이 반쯤 쓴 파일을 보지 않도록
+            self._evict_disk()
+        except OSError as e:
+            print("[CACHE_DISK_ERR]", str(e))
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def _evict_disk(self):
+        entries = []
+        for name in os.listdir(self.disk_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.disk_dir, name)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except OSError:
+                continue
+        if len(entries) <= self.disk_max_entries:
+            return
+        entries.sort()
+        for _, path in entries[:len(entries) - self.disk_max_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,90 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import uuid
+from contextlib import asynccontextmanager
+from fastapi import UploadFile
+from src.result_cache import copy_and_hash
+
+# 업로드 크기/길이 제한 (0이면 제한 없음)
+MAX_UPLOAD_BYTES = int(float(os.getenv("EMOTION_MAX_UPLOAD_MB", "500")) * 1024 * 1024)
+MAX_DURATION_SECS = float(os.getenv("EMOTION_MAX_DURATION_SECS", "1800"))
+# 업로드 저장 위치: 미설정이면 /dev/shm(tmpfs)에 들어갈 때만 /dev/shm, 아니면 시스템 임시 디렉터리
+UPLOAD_DIR = os.getenv("EMOTION_UPLOAD_DIR")
+SHM_DIR = "/dev/shm"
+SHM_RESERVE_BYTES = 64 * 1024 * 1024  # tmpfs를 꽉 채우지 않도록 남겨둘 여유
+
+
+class UploadRejected(Exception):
+    """크기/길이 제한 초과 → 413"""
+
+
+def content_length_exceeded(content_length) -> bool:
+    """Content-Length 헤더만 보고 본문을 받기 전에 거절할지 판단"""
+    if not MAX_UPLOAD_BYTES or not content_length:
+        return False
+    try:
+        return int(content_length) > MAX_UPLOAD_BYTES
+    except ValueError:
+        return False
+
+
+def check_duration(duration_secs):
+    if MAX_DURATION_SECS and duration_secs and duration_secs > MAX_DURATION_SECS:
+        raise UploadRejected(f"영상 길이 초과 ({duration_secs:.0f}초 > {MAX_DURATION_SECS:.0f}초)")
+
+
+def _upload_dir(expected_bytes) -> str:
+    if UPLOAD_DIR:
+        return UPLOAD_DIR
+    if expected_bytes and os.path.isdir(SHM_DIR) and os.access(SHM_DIR, os.W_OK):
+        try:
+            if shutil.disk_usage(SHM_DIR).free - SHM_RESERVE_BYTES > expected_bytes:
+                return SHM_DIR
+        except OSError:
+            pass
+    return tempfile.gettempdir()
+
+
+def save_upload(file: UploadFile):
+    """
+    업로드를 tmpfs(가능하면)에 한 번만 스트리밍 저장 + sha256 계산 → (경로, 해시)
+    - 크기 제한을 넘으면 쓰기 전에 UploadRejected (Content-Length 없이 들어온 업로드 대비)
+    - 정리는 호출 측 책임 (요청 안에서 끝나면 saved_upload 사용)
+    - 파일 복사 + 해시라 블로킹 → 이벤트 루프에서는 asyncio.to_thread로 호출
+    """
+    orig_ext = os.path.splitext(file.filename or "")[1].lower() or ".bin"
+    file.file.seek(0, os.SEEK_END)
+    expected_bytes = file.file.tell()
+    file.file.seek(0)
+    if MAX_UPLOAD_BYTES and expected_bytes > MAX_UPLOAD_BYTES:
+        raise UploadRejected(f"업로드 크기 초과 (최대 {MAX_UPLOAD_BYTES // (1024 * 1024)}MB)")
+    path = os.path.join(_upload_dir(expected_bytes), f"emotion_{uuid.uuid4().hex}{orig_ext}")
+    try:
+        with open(path, "wb") as f:
+            content_hash = copy_and_hash(file.file, f)
+    except BaseException:
+        remove_file(path)
+        raise
+    return path, content_hash
+
+
+@asynccontextmanager
+async def saved_upload(file: UploadFile):
+    """
+    async with saved_upload(file) as (path, content_hash): ... — 예외가 나도 파일 삭제 보장
+    - 저장(복사 + sha256)과 삭제는 스레드에서 실행해 이벤트 루프를 막지 않음
+    """
+    path, content_hash = await asyncio.to_thread(save_upload, file)
+    try:
+        yield path, content_hash
+    finally:
+        await asyncio.to_thread(remove_file, path)
+
+
+def remove_file(path):
+    try:
+        if path and os.path.exists(path): os.remove(path)
+    except OSError:
+        pass
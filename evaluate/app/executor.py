@@ -0,0 +1,78 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Overloaded(Exception):
+    """실행 중 + 대기 중 작업이 한도를 넘음 → 503 (잠시 후 재시도)"""
+
+
+class BoundedExecutor:
+    """
+    블로킹 작업(모델 추론 등)을 이벤트 루프 밖 스레드 풀에서 실행 + 입장 제어
+    - 동시에 workers개 실행, 최대 max_queue개까지 대기, 그 이상은 바로 Overloaded
+      → 무거운 요청이 몰려도 이벤트 루프는 /healthz 등 가벼운 요청에 계속 응답
+    - 대기/실행 수, 거절 수, 대기 시간은 metrics()로 조회 (/metrics에서 노출)
+    """
+
+    def __init__(self, name: str, workers: int, max_queue: int):
+        self.name = name
+        self.workers = max(int(workers), 1)
+        self.max_queue = max(int(max_queue), 0)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._rejected = 0
+        self._completed = 0
+        self._wait_secs = 0.0
+
+    async def run(self, func, *args):
+        with self._lock:
+            if self._queued + self._running >= self.workers + self.max_queue:
+                self._rejected += 1
+                raise Overloaded(f"{self.name}: 처리 대기열이 가득 찼습니다. 잠시 후 다시 시도하세요.")
+            self._queued += 1
+        submitted = time.perf_counter()
+
+        def call():
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._wait_secs += time.perf_counter() - submitted
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+
+        return await asyncio.get_running_loop().run_in_executor(self._pool, call)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queue_depth": self._queued,
+                "rejected_total": self._rejected,
+                "completed_total": self._completed,
+                "queue_wait_seconds_total": round(self._wait_secs, 6),
+            }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
+
+
+def render_executor_metrics(prefix: str, executors) -> str:
+    """Prometheus 텍스트 형식 (외부 의존성 없음)"""
+    samples = [(e.name, e.metrics()) for e in executors]
+    lines = []
+    for key in ("workers", "max_queue", "running", "queue_depth", "rejected_total", "completed_total", "queue_wait_seconds_total"):
+        name = f"{prefix}_executor_{key}"
+        lines.append(f"# TYPE {name} {'counter' if key.endswith('_total') else 'gauge'}")
+        for executor_name, values in samples:
+            lines.append(f'{name}{{executor="{executor_name}"}} {values[key]}')
+    return "\n".join(lines) + "\n"
@@ -3,10 +3,12 @@ import os
 import re
 import json
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 from vllm import LLM, SamplingParams
 from transformers import AutoTokenizer
 from json_repair import repair_json
+from app.executor import BoundedExecutor, Overloaded, render_executor_metrics
 
 def env_str(name: str, default: str | None = None) -> str | None:
     v = os.getenv(name, default)
@@ -27,6 +29,9 @@ def env_float(name: str, default: float) -> float:
 # 모델 경로: MODEL_PATH 우선, 없으면 MODEL_DIR, 둘 다 없으면 기본 경로
 MODEL_PATH = env_str("MODEL_PATH", None) or env_str("MODEL_DIR", "/app/models/llama3-awq-quantized-model")
 
+# 추론 실행기: 오프라인 vllm.LLM은 스레드 안전하지 않으므로 항상 1개씩 실행, 대기 한도(EVAL_MAX_QUEUE)를 넘으면 503
+executor = BoundedExecutor("evaluate", 1, env_int("EVAL_MAX_QUEUE", 8))
+
 class EvaluationRequest(BaseModel):
     question: str
     answer: str
@@ -104,21 +109,37 @@ async def load_model():
         max_tokens=max_tokens,
     )
 
+@app.on_event("shutdown")
+def shutdown_executor():
+    executor.shutdown()
+
 @app.get("/")
 def health():
     return {"status": "ok"}
 
+@app.get("/metrics")
+def metrics():
+    return PlainTextResponse(render_executor_metrics("evaluate", [executor]), media_type="text/plain; version=0.0.4")
+
+def _generate(question: str, answer: str) -> str:
+    """프롬프트 구성 + vLLM 생성 (블로킹 → 실행기에서 호출)"""
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f"### 질문:\n{question}\n\n### 답변:\n{answer}"}
+    ]
+    prompt = app.state.tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
+    out = app.state.llm.generate([prompt], app.state.sampling)
+    return out[0].outputs[0].text.strip()
+
 @app.post("/evaluate", response_model=EvaluationResponse)
 async def evaluate(req: EvaluationRequest):
     try:
-        messages = [
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": f"### 질문:\n{req.question}\n\n### 답변:\n{req.answer}"}
-        ]
-        prompt = app.state.tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
-        out = app.state.llm.generate([prompt], app.state.sampling)
-        generated = out[0].outputs[0].text.strip()
-
+        generated = await executor.run(_generate, req.question, req.answer)
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail={"error": "overloaded", "msg": str(e)}, headers={"Retry-After": "10"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail={"error": "inference_failed", "msg": str(e)})
+    try:
         data = _extract_json(generated)
         score = float(data.get("score", 0))
         feedback = str(data.get("feedback", "")).strip()
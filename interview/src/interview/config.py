@@ -1,14 +1,19 @@
 import os
 from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
+from utils.lazy import Lazy
 
 load_dotenv("src/interview/.env")
 
-llm = ChatOpenAI(
+# 처음 쓰일 때(또는 서버 워밍업 때) 1회 생성
+llm = Lazy("interview_llm", lambda: ChatOpenAI(
     openai_api_key=os.getenv("OPENAI_API_KEY"),
     model="gpt-4o-mini",
     temperature=0.3
-)
+))
+
+def get_llm() -> ChatOpenAI:
+    return llm.get()
 
 
 #llm = ChatOpenAI(
@@ -3,7 +3,7 @@ from typing import Union
 from utils.chroma_qa import save_answer
 from langchain_core.prompts import ChatPromptTemplate
 from interview.node.rules import safe_parse_json_from_llm, validate_language_text, normalize_text
-from interview.config import llm
+from interview.config import get_llm
 
 def answer_node(state: InterviewState) -> Union[InterviewState, None]:
     """답변 수집 노드 - 사용자 입력을 기다리는 상태"""
@@ -86,6 +86,7 @@ def analyze_node(state: InterviewState) -> InterviewState:
             ("human", "답변: {answer}")
         ])
 
+        llm = get_llm()
         try:
             chain = prompt | llm.bind(max_tokens=250, temperature=0.2, top_p=0.8)
         except AttributeError:
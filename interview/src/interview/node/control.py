@@ -96,8 +96,8 @@ def bridge_node(state: "InterviewState") -> "InterviewState":
     )
 
     # 1) LLM 분류(KO/EN 자동 선택)
-    from interview.config import llm
-    llm_res = classify_turn_with_llm(llm, getattr(state, "language", ""), last_q, last_a, topic, cur_t, recent_text)
+    from interview.config import get_llm
+    llm_res = classify_turn_with_llm(get_llm(), getattr(state, "language", ""), last_q, last_a, topic, cur_t, recent_text)
 
     # 2) 휴리스틱
     h_res = heuristic_scores(f"{last_q} {last_a}")
@@ -1,7 +1,7 @@
 from interview.model import InterviewState, ResumeItem
 from interview.node.rules import system_rule
 from utils.chroma_qa import save_question, get_similar_question
-from interview.config import llm
+from interview.config import get_llm
 from langchain_core.prompts import ChatPromptTemplate
 from utils.chroma_setup import reset_interview
 from interview.node.rules import validate_language_text, clean_question
@@ -25,7 +25,7 @@ def extract_topics_node(state):
     topic_desc = state.topics[state.current_topic_index].get("desc", "") if state.topics else ""
     sum_prompt = get_topic_prompt(state.interviewType, resume_text, state.language, desc=topic_desc)
 
-    sum_resp = llm.invoke(sum_prompt)
+    sum_resp = get_llm().invoke(sum_prompt)
     raw_sum = sum_resp.content if hasattr(sum_resp, "content") else str(sum_resp)
     print("📄 자소서 기반 토픽:", raw_sum)
     try:
@@ -89,7 +89,7 @@ def setup_default_topics_node(state: InterviewState) -> InterviewState:
         - { '한국어' if lang_code == 'KOREAN' else '영어'} 질문에 적합한 주제
         """
 
-        resp = llm.invoke(prompt)
+        resp = get_llm().invoke(prompt)
         raw = resp.content if hasattr(resp, "content") else str(resp)
         topics = extract_json_array(raw)
 
@@ -176,7 +176,7 @@ def first_question_node(state: InterviewState) -> InterviewState:
                 "subtype": state.aspect or "METHOD",
             }
             messages = prompt.format_messages(**variables)   # ✅ dict 언패킹
-            response = llm.bind(max_tokens=200, temperature=0.2, top_p=0.8).invoke(messages)
+            response = get_llm().bind(max_tokens=200, temperature=0.2, top_p=0.8).invoke(messages)
             raw_q = (getattr(response, "content", "") or str(response)).strip()
 
         else:  # ❌ 토픽 없으면 직무/경력 기반
@@ -197,7 +197,7 @@ def first_question_node(state: InterviewState) -> InterviewState:
                 "resume": (state.ocrText or getattr(state, "resume", "") or "").strip()[:800],
             }
             messages = prompt.format_messages(**variables)   # ✅ dict 언패킹
-            response = llm.bind(max_tokens=200, temperature=0.2, top_p=0.8).invoke(messages)
+            response = get_llm().bind(max_tokens=200, temperature=0.2, top_p=0.8).invoke(messages)
             raw_q = (getattr(response, "content", "") or "").strip()
 
         # --- 언어 보정 ---
@@ -216,7 +216,7 @@ def first_question_node(state: InterviewState) -> InterviewState:
                 template_format="jinja2"
             )
             messages = fix_prompt.format_messages(q=question)   # ✅ 키워드 인자 방식
-            response = llm.bind(max_tokens=200, temperature=0).invoke(messages)
+            response = get_llm().bind(max_tokens=200, temperature=0).invoke(messages)
             question = (getattr(response, "content", "") or "").strip()
 
         # --- 최종 후처리 ---
@@ -342,7 +342,7 @@ def next_question_node(state: InterviewState) -> InterviewState:
                 "topic_desc": topic_desc
             }
             messages = prompt.format_messages(**variables)  # ✅ dict 언패킹
-            res = llm.invoke(messages)
+            res = get_llm().invoke(messages)
             text = (getattr(res, "content", "") or str(res)).strip()
             return clean_question(text)
 
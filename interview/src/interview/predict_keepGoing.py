@@ -1,15 +1,22 @@
 from transformers import ElectraTokenizer, ElectraForSequenceClassification
 import torch
+from utils.lazy import Lazy
 
-# 모델/토크나이저 전역 로드 (최초 1회)
+# 모델/토크나이저는 처음 쓰일 때(또는 서버 워밍업 때) 1회 로드
 model_path = "./src/koelectra"
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-model = ElectraForSequenceClassification.from_pretrained(model_path).to(device)
-tokenizer = ElectraTokenizer.from_pretrained(model_path)
+
+def _load():
+    model = ElectraForSequenceClassification.from_pretrained(model_path).to(device)
+    tokenizer = ElectraTokenizer.from_pretrained(model_path)
+    return model, tokenizer
+
+classifier = Lazy("keepgoing_classifier", _load)
 
 labels = ["terminate", "continue"]
 
 def keepGoing(question: str, answer: str) -> str:
+    model, tokenizer = classifier.get()
     inputs = tokenizer(
         question + " [SEP] " + answer,
         return_tensors="pt",
@@ -4,14 +4,20 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from contextlib import asynccontextmanager
 from typing import Optional, Literal
-import os, uuid, shutil
+import os, uuid, shutil, time, asyncio
 from utils.chroma_qa import save_turn  # ✅ 추가
 from stt.corrector import correct_transcript
 from interview.model import InterviewState
-from stt.transcriber import stt_from_path
+from stt.transcriber import stt_from_path, resolve_profile, render_stt_metrics, warmup_default_pool
+from stt.streaming import StreamingTranscriber
 from interview.graph import graph_app
 from utils.chroma_setup import reset_chroma, get_collections, reset_interview  # ✅ 변경
-from fastapi.responses import JSONResponse
+from utils.lazy import readiness, is_ready
+from interview.predict_keepGoing import classifier as keepgoing_classifier
+from interview.config import get_llm
+from stt.corrector import llm as corrector_llm
+from fastapi.responses import JSONResponse, PlainTextResponse
+from utils.executor import BoundedExecutor, Overloaded, render_executor_metrics
 # OCR import
 from utils.extractor import (
     extract_text_from_pdf_pymupdf,
@@ -21,14 +27,66 @@ from utils.extractor import (
 import tempfile, os, re
 from utils.text_cleaner import clean_spacing
 
-# ✅ 앱 생명주기: 개발에서만 전역 초기화 + 컬렉션 준비
+# ✅ STT/LLM/그래프 같은 블로킹 작업 실행기: 동시 실행 수 / 최대 대기 수 (넘으면 503)
+executor = BoundedExecutor(
+    "interview",
+    int(os.getenv("INTERVIEW_WORKERS", "4")),
+    int(os.getenv("INTERVIEW_MAX_QUEUE", "16")),
+)
+
+async def run_blocking(func, *args):
+    """블로킹 작업을 실행기에서 실행 (이벤트 루프는 다른 요청/헬스체크에 계속 응답)"""
+    try:
+        return await executor.run(func, *args)
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+# ✅ 같은 면접의 턴은 하나씩: 세션 상태 읽기 → 그래프 → session_state 저장이 겹치지 않게 면접별 잠금
+# (재시도/동시 요청이 같은 InterviewState를 여러 스레드에서 고치지 않도록)
+turn_locks = {}  # interviewId → asyncio.Lock
+
+async def run_turn(interviewId: str, func, *args):
+    """면접별 잠금을 잡고 실행기에서 실행. 클라이언트가 끊겨도 작업이 끝날 때까지 잠금 유지"""
+    lock = turn_locks.setdefault(interviewId, asyncio.Lock())
+    await lock.acquire()
+    task = asyncio.ensure_future(run_blocking(func, *args))
+
+    def release(t):
+        lock.release()
+        if not t.cancelled():
+            t.exception()  # 끊긴 요청의 예외는 여기서 소비 (경고 로그 방지)
+
+    task.add_done_callback(release)
+    return await asyncio.shield(task)
+
+# ✅ 워밍업: 모델/클라이언트는 import 때가 아니라 여기서(또는 처음 쓰일 때) 로드
+def _warmup():
+    t0 = time.perf_counter()
+    steps = [
+        ("chroma", lambda: get_collections()),     # Chroma 클라이언트 + 임베딩 모델(EF) + 컬렉션
+        ("whisper", warmup_default_pool),          # 기본 STT 프로필의 Whisper 인스턴스들
+        ("keepgoing", keepgoing_classifier.get),   # KoELECTRA 분류기
+        ("llm", get_llm),                          # ChatOpenAI 클라이언트
+        ("corrector_llm", corrector_llm.get),
+    ]
+    for name, load in steps:
+        try:
+            load()
+        except Exception as e:
+            print("[WARMUP_ERR]", name, str(e))  # 실패한 구성요소는 처음 쓰일 때 다시 시도
+    print("[WARMUP]", f"done in {time.perf_counter() - t0:.1f}s")
+
+# ✅ 앱 생명주기: 개발에서만 전역 초기화 + 백그라운드 워밍업 (그동안 /healthz는 503)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     if os.getenv("CHROMA_RESET_ON_START", "0") == "1":
-        reset_chroma()
-    # EF가 붙은 컬렉션을 미리 열어 초기화(안 열어도 작동은 함)
-    app.state.qa_questions, app.state.qa_answers, app.state.qa_feedback = get_collections()
+        await asyncio.to_thread(reset_chroma)
+    task = asyncio.create_task(asyncio.to_thread(_warmup))
     yield
+    task.cancel()
+    for entry in list(stt_streams.values()):
+        await asyncio.to_thread(entry["stream"].abort)
+    executor.shutdown()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -41,6 +99,7 @@ app.add_middleware(
 )
 
 UPLOAD_DIR = "temp"
+DELETE_ANSWER_AUDIO = os.getenv("INTERVIEW_DELETE_ANSWER_AUDIO", "0") == "1"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 def _temp_path(name: str) -> str:
@@ -48,10 +107,38 @@ def _temp_path(name: str) -> str:
 
 # ✅ 세션 상태 저장 (메모리)
 session_state = {}
+stt_profiles = {}  # interviewId → 면접 단위 STT 프로필
+
+def _require_state(interviewId: str) -> InterviewState:
+    state = session_state.get(interviewId)
+    if not state:
+        raise HTTPException(status_code=404, detail="면접 세션이 없습니다. /first-ask를 먼저 호출하세요.")
+    return state
+
+def _stt_profile(interviewId: str, override: Optional[str] = None) -> Optional[str]:
+    """요청 값 > 면접 단위 값 > 서버 기본값. 모르는 프로필이면 400"""
+    profile = override or stt_profiles.get(interviewId)
+    try:
+        resolve_profile(profile)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return profile
 
 @app.get("/healthz")
 def healthz():
-    return {"ok": True}
+    # 구성요소별 준비 상태 (ready, required, error, load_secs). 워밍업 대상(required)이 하나라도 안 됐으면 503
+    # (다른 STT 프로필의 Whisper 풀처럼 요청 중에 로드되는 구성요소는 정보로만 표시)
+    components = readiness()
+    ready = is_ready(components)
+    if not ready:
+        return JSONResponse(content={"ok": False, "ready": False, "components": components}, status_code=503)
+    return {"ok": True, "ready": True, "components": components}
+
+@app.get("/metrics")
+def metrics():
+    # Prometheus 텍스트 형식 (실행 중/대기 중 작업 수, 거절 수, Whisper 인스턴스별 가동률)
+    body = render_executor_metrics("interview", [executor]) + render_stt_metrics()
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
 
 # ✅ 첫 질문 요청용 Request 모델
 class StateRequest(BaseModel):
@@ -64,10 +151,15 @@ class StateRequest(BaseModel):
     seq: int = 1
     interviewId: str
     count: int = 0                          # 0이면 노드에서 기본 로직(최대 20)
+    sttProfile: Optional[str] = None        # STT 프로필(fast/balanced/accurate), 없으면 서버 기본값
 
 @app.post("/first-ask")
 async def first_ask(payload: StateRequest, request: Request):
     print("📦 [payload]:", payload.model_dump())
+    stt_profiles[payload.interviewId] = _stt_profile(payload.interviewId, payload.sttProfile)
+    return await run_turn(payload.interviewId, _first_ask, payload)
+
+def _first_ask(payload: StateRequest):
     try:
         # ✅ 이 인터뷰의 기존 데이터만 초기화 (운영 안전)
         reset_interview(payload.interviewId)
@@ -144,11 +236,11 @@ async def stt_ask(
     interviewId: str = Form(...),
     seq: int | None = Form(None),   # ← 하위 호환용(무시)
     question: str = Form(None),     # ✅ (옵션) 동적 모드용 질문
+    sttProfile: str = Form(None),   # ✅ (옵션) 이 답변만 다른 STT 프로필로
 ):
-    # 1) 세션 불러오기
-    state = session_state.get(interviewId)
-    if not state:
-        raise HTTPException(status_code=404, detail="면접 세션이 없습니다. /first-ask를 먼저 호출하세요.")
+    # 1) 세션 확인 (상태는 면접별 잠금을 잡은 뒤 다시 읽음)
+    _require_state(interviewId)
+    profile = _stt_profile(interviewId, sttProfile)
 
     # 2) 업로드 파일 저장 (임시 보관)
     ext = (file.filename or "uploaded").split(".")[-1].lower()
@@ -158,11 +250,25 @@ async def stt_ask(
     with open(in_path, "wb") as f:
         shutil.copyfileobj(file.file, f)
 
+    # 3~6) STT → 교정 → 그래프 → 저장 (블로킹 작업은 실행기에서)
+    return await run_turn(interviewId, _stt_ask, interviewId, in_path, question, profile)
+
+def _stt_ask(interviewId, in_path, question, profile=None):
     # 3) STT 실행 (numpy 기반)
-    raw_transcript, _ = stt_from_path(in_path, language=state.language)
+    try:
+        state = _require_state(interviewId)
+        raw_transcript, segments = stt_from_path(in_path, language=state.language, profile=profile)
+    finally:
+        # 기본은 기존처럼 답변 음성을 temp/에 보관, 설정 시에만 STT 후 삭제
+        if DELETE_ANSWER_AUDIO and os.path.exists(in_path):
+            os.remove(in_path)
+    return process_answer_turn(state, interviewId, raw_transcript, question, segments)
 
+def process_answer_turn(state, interviewId, raw_transcript, question=None, segments=None):
+    """STT 결과 한 건으로 답변 턴 진행: 교정 → 답변 반영 → 그래프(분석/꼬리질문) → 저장 → 응답"""
     # 4) 교정 실행 (언어별 교정 전략)
-    corrected_dict = correct_transcript(raw_transcript, language=state.language)
+    # (segments가 있으면 신뢰도 낮은 구간만 LLM 교정)
+    corrected_dict = correct_transcript(raw_transcript, language=state.language, segments=segments)
     corrected = corrected_dict.get("corrected", raw_transcript) if isinstance(corrected_dict, dict) else raw_transcript
     
     # 4) 답변 업데이트 (→ DB 저장은 answer_node에서 처리됨)
@@ -213,6 +319,63 @@ async def stt_ask(
         "keepGoing": getattr(result, "keepGoing", True),
     }
 
+# ✅ 스트리밍 STT: 답변 녹음 조각을 받는 동안 끝난 발화부터 전사 → finish 시점엔 거의 다 끝나 있음
+STREAM_TTL_SECS = int(os.getenv("INTERVIEW_STREAM_TTL_SECS", "600"))
+stt_streams = {}  # streamId → {"interviewId", "stream", "touched"}
+
+def _expire_streams():
+    now = time.time()
+    for stream_id, entry in list(stt_streams.items()):
+        if now - entry["touched"] > STREAM_TTL_SECS:
+            stt_streams.pop(stream_id, None)
+            entry["stream"].abort()
+
+def _get_stream(streamId: str):
+    entry = stt_streams.get(streamId)
+    if not entry:
+        raise HTTPException(status_code=404, detail="STT 스트림이 없습니다. /stt-stream/start를 먼저 호출하세요.")
+    entry["touched"] = time.time()
+    return entry
+
+@app.post("/stt-stream/start")
+async def stt_stream_start(interviewId: str = Form(...), sttProfile: str = Form(None)):
+    state = _require_state(interviewId)
+    profile = _stt_profile(interviewId, sttProfile)
+    await asyncio.to_thread(_expire_streams)
+
+    stream_id = uuid.uuid4().hex
+    stream = await asyncio.to_thread(StreamingTranscriber, state.language, profile)
+    stt_streams[stream_id] = {"interviewId": interviewId, "stream": stream, "touched": time.time()}
+    return {"streamId": stream_id}
+
+@app.post("/stt-stream/{streamId}/chunk")
+async def stt_stream_chunk(streamId: str, file: UploadFile = File(...)):
+    entry = _get_stream(streamId)
+    stream = entry["stream"]
+    try:
+        await asyncio.to_thread(stream.feed, await file.read())
+    except (BrokenPipeError, ValueError):
+        stt_streams.pop(streamId, None)
+        await asyncio.to_thread(stream.abort)
+        raise HTTPException(status_code=400, detail="오디오 조각을 디코딩할 수 없습니다.")
+    return {"streamId": streamId, "received": stream.received_bytes, "partial": stream.partial()}
+
+@app.post("/stt-stream/{streamId}/finish")
+async def stt_stream_finish(streamId: str, question: str = Form(None)):
+    entry = _get_stream(streamId)
+    _require_state(entry["interviewId"])
+    stt_streams.pop(streamId, None)
+    try:
+        return await run_turn(entry["interviewId"], _stt_stream_finish, entry["interviewId"], entry["stream"], question)
+    except HTTPException:
+        await asyncio.to_thread(entry["stream"].abort)  # 대기열 초과(503) 등 → ffmpeg/전사 스레드 정리
+        raise
+
+def _stt_stream_finish(interviewId, stream, question):
+    state = _require_state(interviewId)
+    raw_transcript, segments = stream.finish()
+    return process_answer_turn(state, interviewId, raw_transcript, question, segments)
+
 # OCR 메서드
 def clean_text(text: str) -> str:
     text = re.sub(r'\s+', ' ', text)  # 공백 정리
@@ -1,23 +1,75 @@
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
-import os,re
+import os,re,threading
+from collections import OrderedDict
+from utils.lazy import Lazy
 
 load_dotenv("src/interview/.env")
 
-llm = ChatOpenAI(
+# 처음 쓰일 때(또는 서버 워밍업 때) 1회 생성
+llm = Lazy("corrector_llm", lambda: ChatOpenAI(
     openai_api_key=os.getenv("OPENAI_API_KEY"),
     model="gpt-4o-mini",
     temperature=0.3
-)
-def postprocess_text(text: str, language: str = "ko") -> str:
+))
+
+# 교정 방식: gated(기본, STT 신뢰도 낮은 구간만 LLM) / always(기존처럼 답변 전체를 LLM)
+CORRECTION_MODE = os.getenv("INTERVIEW_CORRECTION_MODE", "gated")
+# 이 기준보다 신뢰도가 낮은 세그먼트만 LLM으로 교정 (faster-whisper 세그먼트 통계)
+CORRECTION_MIN_LOGPROB = float(os.getenv("INTERVIEW_CORRECTION_LOGPROB", "-0.5"))
+CORRECTION_MAX_NO_SPEECH = float(os.getenv("INTERVIEW_CORRECTION_NO_SPEECH", "0.5"))
+CORRECTION_CACHE_SIZE = int(os.getenv("INTERVIEW_CORRECTION_CACHE_SIZE", "1024"))
+
+# 면접 상태의 언어 값(KOREAN/ENGLISH) → 교정 규칙 언어 코드
+# (기존에는 "KOREAN"이 그대로 넘어와 한국어 답변도 영어 프롬프트로 교정되고 한국어 후처리 규칙이 적용되지 않았음)
+LANG_CODES = {"KOREAN": "ko", "ENGLISH": "en"}
+
+def _lang_code(language: str) -> str:
+    return LANG_CODES.get(language, language)
+
+class CorrectionCache:
+    """구간 텍스트 → LLM 교정 결과 (LRU, 스레드 안전). 자주 나오는 표현은 LLM을 다시 부르지 않음"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, language: str, text: str):
+        key = (language, re.sub(r"\s+", " ", text.strip()))
+        with self._lock:
+            if key not in self._items:
+                return None
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, language: str, text: str, corrected: str):
+        if self.max_entries <= 0:
+            return
+        key = (language, re.sub(r"\s+", " ", text.strip()))
+        with self._lock:
+            self._items[key] = corrected
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+correction_cache = CorrectionCache(CORRECTION_CACHE_SIZE)
+
+def postprocess_text(text: str, language: str = "ko", numbers: bool = True) -> str:
+    """
+    로컬 교정 규칙
+    - numbers=False면 숫자 규칙('1개' → '한계' 등)은 건너뜀: 문맥 없이 바꾸면 맞게 인식된 숫자도 틀리게 되므로
+      LLM 교정을 거친 텍스트에만 적용
+    """
     if language == "ko":
         # 1) 데이터셋 관련 오류
         text = re.sub(r"(데이터)\s*세세", r"\1셋", text)
 
         # 2) 숫자 오류
-        text = re.sub(r"\b1개\b", "한계", text)
-        text = re.sub(r"\b18\b", "십팔", text)
+        if numbers:
+            text = re.sub(r"\b1개\b", "한계", text)
+            text = re.sub(r"\b18\b", "십팔", text)
 
         # 3) AI/ML 관련
         text = text.replace("에이아이", "AI")
@@ -26,9 +78,9 @@ def postprocess_text(text: str, language: str = "ko") -> str:
         text = text.replace("머신 러닝", "머신러닝")
     return text
 
-def correct_transcript(raw_text: str, language: str = "ko") -> dict:
+def _system_prompt(language: str) -> str:
     if language == "ko":
-        system_prompt = (
+        return (
             "너는 한국어 음성 인식 텍스트 교정기다.\n"
             "- 발화자의 말투와 추임새(음, 어, 그 등)는 보존한다.\n"
             "- 맞춤법, 띄어쓰기, 문장부호를 교정한다.\n"
@@ -37,28 +89,90 @@ def correct_transcript(raw_text: str, language: str = "ko") -> dict:
             "⚠️ 절대로 원문에 없는 새로운 문장을 추가하지 않는다.\n"
             "⚠️ 원문 문장의 개수와 순서를 유지한다.\n"
         )
-    else:
-        system_prompt = (
-            "You are an English ASR transcript corrector.\n"
-            "- Preserve filler words (um, uh, etc.).\n"
-            "- Fix typos, spacing, and punctuation.\n"
-            "- Do not change words based on possible mispronunciations.\n"
-            "⚠️ Do not add new sentences or expand the content.\n"
-            "⚠️ Keep the same number of sentences and their order.\n"
-        )
+    return (
+        "You are an English ASR transcript corrector.\n"
+        "- Preserve filler words (um, uh, etc.).\n"
+        "- Fix typos, spacing, and punctuation.\n"
+        "- Do not change words based on possible mispronunciations.\n"
+        "⚠️ Do not add new sentences or expand the content.\n"
+        "⚠️ Keep the same number of sentences and their order.\n"
+    )
 
+# 구간 여러 개를 한 번에 보낼 때 추가 규칙 (번호 줄 형식 유지)
+_LINES_RULE = {
+    "ko": "- 입력은 번호가 붙은 별개의 구간들이다. 같은 번호와 줄 수를 유지해 '번호) 교정문' 형식으로만 답한다.\n",
+    "en": "- The input is numbered, independent segments. Answer only as 'N) corrected text' lines, keeping the same numbers and line count.\n",
+}
+
+def _invoke_llm(system_prompt: str, raw_text: str) -> str:
     prompt = ChatPromptTemplate.from_messages([
         ("system", system_prompt),
         ("human", "{raw_text}")
     ])
+    chain = prompt | llm.get()
+    return chain.invoke({"raw_text": raw_text}).content.strip()
+
+def _llm_correct_lines(lines: list, language: str):
+    """신뢰도 낮은 구간들만 번호를 붙여 한 번에 교정 → 같은 순서의 리스트 (형식이 어긋나면 None)"""
+    numbered = "\n".join(f"{i + 1}) {text}" for i, text in enumerate(lines))
+    answer = _invoke_llm(_system_prompt(language) + _LINES_RULE.get(language, _LINES_RULE["en"]), numbered)
+    fixed = {}
+    for line in answer.splitlines():
+        m = re.match(r"^\s*(\d+)\)\s*(.*)$", line)
+        if m:
+            fixed[int(m.group(1))] = m.group(2).strip()
+    if sorted(fixed) != list(range(1, len(lines) + 1)):
+        print("[CORRECT_WARN]", f"LLM 응답 줄 수 불일치 (expected={len(lines)}, got={len(fixed)}) → 로컬 교정만 사용")
+        return None
+    return [fixed[i + 1] for i in range(len(lines))]
+
+def _needs_llm(segment: dict) -> bool:
+    return (
+        segment.get("avg_logprob", 0.0) < CORRECTION_MIN_LOGPROB
+        or segment.get("no_speech_prob", 0.0) > CORRECTION_MAX_NO_SPEECH
+    )
+
+def correct_transcript(raw_text: str, language: str = "ko", segments: list = None) -> dict:
+    """
+    STT 결과 교정 → {"raw", "corrected", "llm_segments"}
+    - segments(STT 세그먼트, avg_logprob/no_speech_prob 포함)가 있으면:
+      모든 구간에 숫자 규칙을 뺀 로컬 규칙 적용 → 신뢰도 낮은 구간만 (캐시에 없으면) LLM 한 번에 교정
+      (숫자 규칙은 LLM을 거친 구간에만 적용, LLM을 거치지 않은 구간의 숫자는 그대로 둠)
+    - segments가 없거나 INTERVIEW_CORRECTION_MODE=always면 기존처럼 답변 전체를 LLM으로 교정
+    """
+    language = _lang_code(language)
+
+    if segments is None or CORRECTION_MODE == "always":
+        result = _invoke_llm(_system_prompt(language), raw_text)
+        # ✅ 후처리 규칙 적용
+        result = postprocess_text(result, language=language)
+        return {"raw": raw_text, "corrected": result, "llm_segments": len(segments or []) or 1}
 
-    chain = prompt | llm
-    result = chain.invoke({"raw_text": raw_text}).content.strip()
+    texts = [postprocess_text(seg["text"], language=language, numbers=False) for seg in segments]
+    pending = []
+    for i, seg in enumerate(segments):
+        if not texts[i] or not _needs_llm(seg):
+            continue
+        cached = correction_cache.get(language, texts[i])
+        if cached is not None:
+            texts[i] = cached
+        else:
+            pending.append(i)
 
-    # ✅ 후처리 규칙 적용
-    result = postprocess_text(result, language=language)
+    if pending:
+        try:
+            fixed = _llm_correct_lines([texts[i] for i in pending], language)
+        except Exception as e:
+            print("[CORRECT_ERR]", str(e))  # LLM 실패 시 로컬 교정 결과로 진행
+            fixed = None
+        for i, text in zip(pending, fixed or []):
+            text = postprocess_text(text, language=language)
+            correction_cache.put(language, texts[i], text)
+            texts[i] = text
 
+    print("[CORRECT]", f"segments={len(segments)} llm={len(pending)}")
     return {
         "raw": raw_text,
-        "corrected": result
-    }
\ No newline at end of file
+        "corrected": " ".join(t for t in texts if t),
+        "llm_segments": len(pending),
+    }
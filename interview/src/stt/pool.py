@@ -0,0 +1,119 @@
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from faster_whisper import WhisperModel
+from utils.executor import Overloaded
+
+# Whisper 인스턴스 풀 설정
+STT_INSTANCES = max(int(os.getenv("INTERVIEW_STT_INSTANCES", "2")), 1)
+STT_CPU_THREADS = int(os.getenv("INTERVIEW_STT_CPU_THREADS", "0") or 0) or max((os.cpu_count() or 1) // STT_INSTANCES, 1)
+STT_NUM_WORKERS = max(int(os.getenv("INTERVIEW_STT_NUM_WORKERS", "1")), 1)
+STT_MAX_QUEUE = max(int(os.getenv("INTERVIEW_STT_MAX_QUEUE", "16")), 0)
+
+
+class WhisperPool:
+    """
+    같은 모델(크기, compute_type)의 Whisper 인스턴스 N개를 미리 로드해 두고 빌려주는 풀
+    - 인스턴스마다 cpu_threads개 스레드, num_workers개 동시 전사 (슬롯 = 인스턴스 수 x num_workers)
+    - 빈 슬롯이 없으면 대기, 대기 중인 요청이 max_queue개를 넘으면 Overloaded (→ 503)
+    - 인스턴스별 사용 시간/호출 수로 가동률(utilization)을 metrics()에서 계산
+    """
+
+    def __init__(self, size: str, compute_type: str, instances: int = STT_INSTANCES,
+                 cpu_threads: int = STT_CPU_THREADS, num_workers: int = STT_NUM_WORKERS, max_queue: int = STT_MAX_QUEUE):
+        self.name = f"{size}-{compute_type}"
+        self.max_queue = max_queue
+        self._models = [
+            WhisperModel(
+                size,                       # 모델 크기 (tiny / base / small / medium / large-v2 가능)
+                device="cpu",               # GPU 쓸 경우 "cuda"
+                compute_type=compute_type,  # CPU는 int8이 가장 효율적
+                cpu_threads=cpu_threads,
+                num_workers=num_workers,
+            )
+            for _ in range(instances)
+        ]
+        self._free = queue.Queue()
+        for _ in range(num_workers):
+            for i in range(instances):
+                self._free.put(i)
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._rejected = 0
+        self._skipped = 0
+        self._busy_secs = [0.0] * instances
+        self._calls = [0] * instances
+        self._started = time.monotonic()
+
+    @contextmanager
+    def acquire(self, block: bool = True):
+        """
+        인스턴스 하나를 빌림 → WhisperModel (block=False면 빈 슬롯이 없을 때 None)
+        - 스트리밍 중간 전사는 block=False로 호출해 바쁘면 다음 차례로 미룸 (오디오는 버퍼에 남아 있음)
+        """
+        try:
+            index = self._free.get_nowait()
+        except queue.Empty:
+            if not block:
+                with self._lock:
+                    self._skipped += 1
+                yield None
+                return
+            with self._lock:
+                if self._waiting >= self.max_queue:
+                    self._rejected += 1
+                    raise Overloaded(f"STT({self.name}) 대기열이 가득 찼습니다. 잠시 후 다시 시도하세요.")
+                self._waiting += 1
+            try:
+                index = self._free.get()
+            finally:
+                with self._lock:
+                    self._waiting -= 1
+
+        t0 = time.perf_counter()
+        try:
+            yield self._models[index]
+        finally:
+            with self._lock:
+                self._busy_secs[index] += time.perf_counter() - t0
+                self._calls[index] += 1
+            self._free.put(index)
+
+    def metrics(self) -> dict:
+        uptime = max(time.monotonic() - self._started, 1e-9)
+        with self._lock:
+            return {
+                "instances": len(self._models),
+                "free_slots": self._free.qsize(),
+                "queue_depth": self._waiting,
+                "rejected_total": self._rejected,
+                "skipped_total": self._skipped,
+                "workers": [
+                    {
+                        "busy_seconds_total": round(busy, 6),
+                        "calls_total": calls,
+                        "utilization": round(min(busy / uptime, 1.0), 4),
+                    }
+                    for busy, calls in zip(self._busy_secs, self._calls)
+                ],
+            }
+
+
+def render_pool_metrics(pools) -> str:
+    """Prometheus 텍스트 형식: 풀 단위 게이지/카운터 + 인스턴스(worker)별 사용 시간, 호출 수, 가동률"""
+    samples = [(p.name, p.metrics()) for p in pools]
+    lines = []
+    for key in ("instances", "free_slots", "queue_depth", "rejected_total", "skipped_total"):
+        name = f"interview_stt_{key}"
+        lines.append(f"# TYPE {name} {'counter' if key.endswith('_total') else 'gauge'}")
+        for pool_name, values in samples:
+            lines.append(f'{name}{{model="{pool_name}"}} {values[key]}')
+    for key in ("busy_seconds_total", "calls_total", "utilization"):
+        name = f"interview_stt_worker_{key}"
+        lines.append(f"# TYPE {name} {'counter' if key.endswith('_total') else 'gauge'}")
+        for pool_name, values in samples:
+            for i, worker in enumerate(values["workers"]):
+                lines.append(f'{name}{{model="{pool_name}",worker="{i}"}} {worker[key]}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,176 @@
+import subprocess
+import threading
+import numpy as np
+from faster_whisper.vad import VadOptions, get_speech_timestamps
+from stt.transcriber import transcribe_array, resolve_profile
+
+SAMPLE_RATE = 16000
+READ_BYTES = 64 * 1024          # ffmpeg stdout에서 한 번에 읽는 양 (float32 16k samples = 1초)
+STEP_SECS = 1.0                 # 새 오디오가 이만큼 쌓일 때마다 VAD로 끊을 곳을 찾음
+TAIL_SILENCE_SECS = 0.6         # 발화 끝 뒤에 이만큼 무음이 와야 "끝난 발화"로 보고 전사
+MAX_PENDING_SECS = 28.0         # 끊을 곳 없이 이보다 길어지면 강제로 잘라 전사 (Whisper 창 30초)
+
+# 실시간 분할용 VAD: 문장 사이 짧은 쉼(0.5초)에서도 끊음
+STREAM_VAD = VadOptions(min_silence_duration_ms=500, speech_pad_ms=200)
+
+
+class StreamingTranscriber:
+    """
+    ffmpeg 파이프로 오디오를 조금씩 디코딩하면서, VAD로 끝난 발화 구간만 바로바로 전사 (/stt-stream/* 전용)
+    - feed(bytes)로 받은 업로드 조각을 ffmpeg stdin으로 넘김 (webm/ogg/wav/mp3처럼 스트리밍 가능한 형식)
+    - 구간별로 따로 전사하므로 파일 전체를 한 번에 전사하는 stt_from_path와 결과가 조금 다를 수 있음
+    - finish(): 입력 종료 → 남은 오디오만 전사 → (transcript, segments) (stt_from_path와 같은 형식)
+    """
+
+    def __init__(self, language: str = None, profile: str = None):
+        resolve_profile(profile)  # 모르는 프로필이면 ffmpeg를 띄우기 전에 ValueError
+        self.language = language
+        self.profile = profile
+        command = [
+            "ffmpeg",
+            "-i", "pipe:0",
+            "-f", "f32le",  # raw float32 PCM
+            "-ac", "1",     # mono
+            "-ar", str(SAMPLE_RATE),
+            "pipe:1"
+        ]
+        self._command = command
+        self._proc = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        self._cond = threading.Condition()
+        self._pcm = bytearray()     # 아직 전사하지 않은 오디오 (float32 bytes)
+        self._offset = 0            # _pcm[0]의 전체 오디오 기준 샘플 위치
+        self._eof = False
+        self._aborted = False       # abort()면 남은 오디오를 전사하지 않고 바로 종료
+        self._error = None
+        self._segments = []
+        self.received_bytes = 0
+
+        self._reader = threading.Thread(target=self._read_loop, name="stt-ffmpeg", daemon=True)
+        self._worker = threading.Thread(target=self._transcribe_loop, name="stt-stream", daemon=True)
+        self._reader.start()
+        self._worker.start()
+
+    # ---------- 입력 ----------
+    def feed(self, data: bytes):
+        if not data:
+            return
+        self.received_bytes += len(data)
+        self._proc.stdin.write(data)
+        self._proc.stdin.flush()
+
+    def _close_input(self):
+        if self._proc.stdin is not None and not self._proc.stdin.closed:
+            try:
+                self._proc.stdin.close()
+            except BrokenPipeError:
+                pass
+
+    def _read_loop(self):
+        stdout = self._proc.stdout
+        while True:
+            chunk = stdout.read(READ_BYTES)
+            if not chunk:
+                break
+            with self._cond:
+                self._pcm.extend(chunk[: len(chunk) - len(chunk) % 4])
+                self._cond.notify()
+        with self._cond:
+            self._eof = True
+            self._cond.notify()
+
+    # ---------- 전사 ----------
+    def _pending(self) -> np.ndarray:
+        with self._cond:
+            return np.frombuffer(bytes(self._pcm), np.float32)
+
+    def _commit(self, n_samples: int):
+        with self._cond:
+            del self._pcm[: n_samples * 4]
+            self._offset += n_samples
+
+    def _transcribe(self, audio: np.ndarray, vad_filter: bool, block: bool = True) -> bool:
+        """전사해서 결과에 추가. block=False이고 Whisper 풀이 모두 사용 중이면 False (다음 차례에 다시 시도)"""
+        results = transcribe_array(audio, language=self.language, offset=self._offset / SAMPLE_RATE,
+                                   vad_filter=vad_filter, profile=self.profile, block=block)
+        if results is None:
+            return False
+        self._segments.extend([r for r in results if r["text"]])
+        return True
+
+    def _cut_point(self, audio: np.ndarray):
+        """(전사해도 되는 앞부분 길이(샘플), 그 안에 발화가 있는지). 길이 0이면 아직 기다림"""
+        speech = get_speech_timestamps(audio, STREAM_VAD, sampling_rate=SAMPLE_RATE)
+        guard = len(audio) - int(TAIL_SILENCE_SECS * SAMPLE_RATE)
+        closed = [s for s in speech if s["end"] <= guard]
+        if closed:
+            return closed[-1]["end"], True
+        if len(audio) > MAX_PENDING_SECS * SAMPLE_RATE:
+            if not speech:
+                return guard, False  # 긴 무음은 전사하지 않고 버림
+            return int(MAX_PENDING_SECS * SAMPLE_RATE), True
+        return 0, False
+
+    def _transcribe_loop(self):
+        step = int(STEP_SECS * SAMPLE_RATE) * 4
+        checked = 0
+        try:
+            while True:
+                with self._cond:
+                    while not self._eof and len(self._pcm) - checked < step:
+                        self._cond.wait()
+                    eof = self._eof
+                if eof or self._aborted:
+                    break
+                audio = self._pending()
+                checked = len(audio) * 4
+                cut, has_speech = self._cut_point(audio)
+                if cut <= 0:
+                    continue
+                if has_speech and not self._transcribe(audio[:cut], vad_filter=True, block=False):
+                    continue
+                self._commit(cut)
+                checked -= cut * 4
+
+            if self._aborted:
+                return
+            audio = self._pending()
+            if len(audio):
+                self._transcribe(audio, vad_filter=True)
+                self._commit(len(audio))
+        except Exception as e:
+            self._error = e
+            self._close_input()
+            self._proc.kill()
+
+    # ---------- 조회 / 종료 ----------
+    def partial(self) -> str:
+        """지금까지 확정된 전사 (발화 중 중간 결과)"""
+        return " ".join(r["text"] for r in list(self._segments))
+
+    def finish(self):
+        self._close_input()
+        self._reader.join()
+        returncode = self._proc.wait()
+        self._worker.join()
+        if self._error is not None:
+            raise self._error
+        if returncode != 0 and not self._segments:
+            raise subprocess.CalledProcessError(returncode, self._command)
+        transcript = " ".join(r["text"] for r in self._segments)
+        return transcript, list(self._segments)
+
+    def abort(self):
+        """전사 없이 종료 (진행 중인 중간 전사가 있으면 그것만 끝날 때까지 기다림)"""
+        with self._cond:
+            self._aborted = True
+            self._cond.notify()
+        self._close_input()
+        self._proc.kill()
+        self._reader.join()
+        self._proc.wait()
+        self._worker.join()
@@ -1,13 +1,84 @@
+import os
 import subprocess
+import threading
 import numpy as np
-from faster_whisper import WhisperModel
+from stt.pool import WhisperPool, render_pool_metrics
+from utils.lazy import Lazy
 
-# ✅ CPU + medium 모델 (형 노트북 VRAM 6GB 기준)
-model = WhisperModel(
-    "small",            # 모델 크기 (tiny / base / small / medium / large-v2 가능)
-    device="cpu",       # GPU 쓸 경우 "cuda"
-    compute_type="int8" # CPU는 int8이 가장 효율적
-)
+# -----------------------------
+# 디코딩 프로필
+# -----------------------------
+# - fast: base 모델, 그리디(beam 1) 한 번
+# - balanced: small 모델, 그리디로 먼저 전사 → 신뢰도 낮은 구간만 beam 5로 다시 전사 (적응형)
+# - accurate: 기존 옵션 그대로 (small, beam 10, patience 2) — 기본 프로필이라 모델은 기존과 같게 두고,
+#   INTERVIEW_STT_ACCURATE_MODEL=medium 등으로 키울 수 있음
+# 모델 크기/compute_type은 INTERVIEW_STT_{프로필}_MODEL / _COMPUTE_TYPE으로 프로필별 변경 가능
+def _profile_model(name: str, model: str, compute_type: str = "int8") -> dict:
+    return {
+        "model": os.getenv(f"INTERVIEW_STT_{name.upper()}_MODEL", model),
+        "compute_type": os.getenv(f"INTERVIEW_STT_{name.upper()}_COMPUTE_TYPE", compute_type),
+    }
+
+STT_PROFILES = {
+    "fast": {
+        **_profile_model("fast", "base"),
+        "beam_size": 1, "patience": 1, "vad_filter": True,
+        "redecode": None,
+    },
+    "balanced": {
+        **_profile_model("balanced", "small"),
+        "beam_size": 1, "patience": 1, "vad_filter": True,
+        "redecode": {"beam_size": 5, "patience": 1},
+    },
+    "accurate": {
+        **_profile_model("accurate", "small"),
+        "beam_size": 10, "patience": 2, "vad_filter": True,
+        "redecode": None,
+    },
+}
+DEFAULT_PROFILE = os.getenv("INTERVIEW_STT_PROFILE", "accurate")
+
+# 다시 전사할 구간 기준 (faster-whisper 세그먼트 통계)
+REDECODE_MAX_AVG_LOGPROB = float(os.getenv("INTERVIEW_STT_REDECODE_LOGPROB", "-0.6"))
+REDECODE_MIN_NO_SPEECH = float(os.getenv("INTERVIEW_STT_REDECODE_NO_SPEECH", "0.5"))
+REDECODE_PAD_SECS = 0.2
+
+SAMPLE_RATE = 16000
+
+def resolve_profile(name: str = None) -> dict:
+    """프로필 이름 → 설정 (None이면 INTERVIEW_STT_PROFILE). 모르는 이름이면 ValueError"""
+    name = name or DEFAULT_PROFILE
+    if name not in STT_PROFILES:
+        raise ValueError(f"알 수 없는 STT 프로필입니다: {name} (가능: {', '.join(STT_PROFILES)})")
+    return STT_PROFILES[name]
+
+# ✅ Whisper 인스턴스 풀은 (크기, compute_type)별로 처음 쓰일 때 한 번만 생성해서 프로필끼리 공유
+_pools = {}
+_pools_lock = threading.Lock()
+
+def _pool_component(size: str, compute_type: str, required: bool = False) -> Lazy:
+    key = (size, compute_type)
+    if key not in _pools:
+        with _pools_lock:
+            if key not in _pools:
+                _pools[key] = Lazy(f"whisper_{size}_{compute_type}", lambda: WhisperPool(size, compute_type),
+                                   required=required)
+    return _pools[key]
+
+def get_pool(size: str = "small", compute_type: str = "int8") -> WhisperPool:
+    return _pool_component(size, compute_type).get()
+
+def warmup_default_pool():
+    """기본 프로필의 Whisper 풀 로드 (서버 워밍업용)"""
+    cfg = resolve_profile()
+    get_pool(cfg["model"], cfg["compute_type"])
+
+def render_stt_metrics() -> str:
+    return render_pool_metrics([c.get() for c in list(_pools.values()) if c.loaded])
+
+# ✅ 기본 프로필 풀만 준비 여부에 반영 (로드는 워밍업에서). 다른 프로필 풀은 처음 쓰일 때 로드되며 healthz엔 정보로만 표시
+_default = resolve_profile()
+_pool_component(_default["model"], _default["compute_type"], required=True)
 
 # -----------------------------
 # 오디오 로더 (ffmpeg → numpy)
@@ -30,36 +101,93 @@ def load_audio_as_numpy(input_path: str, sr: int = 16000) -> np.ndarray:
     return np.frombuffer(proc.stdout, np.float32)
 
 # -----------------------------
-# STT 실행 (final 모드 고정)
+# STT 실행
 # -----------------------------
-def transcribe_audio(input_path: str, language: str = None):
-    audio = load_audio_as_numpy(input_path)
-
-    # ✅ 항상 정확도 최우선 옵션
-    beam_size, patience = 10, 2
-
-    # 언어 매핑
-    LANG_MAP = {
-        "KOREAN": "ko",
-        "ENGLISH": "en"
-    }
-    lang_opt = LANG_MAP.get(language, None)  # None이면 auto detect
+# 언어 매핑
+LANG_MAP = {
+    "KOREAN": "ko",
+    "ENGLISH": "en"
+}
 
+def _decode(model, audio: np.ndarray, lang_opt, beam_size: int, patience: float, vad_filter: bool):
     segments, _ = model.transcribe(
         audio,
         beam_size=beam_size,
         patience=patience,
         language=lang_opt,  # ✅ 여기서 ISO 코드 사용
-        vad_filter=True,
+        vad_filter=vad_filter,
         temperature=0.0
     )
+    return [
+        {
+            "start": seg.start,
+            "end": seg.end,
+            "text": seg.text.strip(),
+            "avg_logprob": seg.avg_logprob,
+            "no_speech_prob": seg.no_speech_prob,
+        }
+        for seg in segments
+    ]
+
+def _is_low_confidence(seg: dict) -> bool:
+    return seg["avg_logprob"] < REDECODE_MAX_AVG_LOGPROB or seg["no_speech_prob"] > REDECODE_MIN_NO_SPEECH
 
-    results = [{"start": seg.start, "end": seg.end, "text": seg.text.strip()} for seg in segments]
+def _redecode_low_confidence(model, audio: np.ndarray, results: list, profile: dict, lang_opt) -> list:
+    """신뢰도 낮은 세그먼트만 앞뒤로 조금 넓혀 잘라 큰 beam으로 다시 전사 (더 나을 때만 교체)"""
+    opts = profile["redecode"]
+    out = []
+    for seg in results:
+        if not _is_low_confidence(seg):
+            out.append(seg)
+            continue
+        s = max(int((seg["start"] - REDECODE_PAD_SECS) * SAMPLE_RATE), 0)
+        e = min(int((seg["end"] + REDECODE_PAD_SECS) * SAMPLE_RATE), len(audio))
+        retry = _decode(model, audio[s:e], lang_opt, opts["beam_size"], opts["patience"], vad_filter=False)
+        if not retry:
+            out.append(seg)
+            continue
+        avg_logprob = sum(r["avg_logprob"] for r in retry) / len(retry)
+        if avg_logprob <= seg["avg_logprob"]:
+            out.append(seg)
+            continue
+        out.append({
+            "start": seg["start"],
+            "end": seg["end"],
+            "text": " ".join(r["text"] for r in retry if r["text"]),
+            "avg_logprob": avg_logprob,
+            "no_speech_prob": min(r["no_speech_prob"] for r in retry),
+        })
+    return out
+
+def transcribe_array(audio: np.ndarray, language: str = None, offset: float = 0.0, vad_filter: bool = True,
+                     profile: str = None, block: bool = True):
+    """
+    16kHz mono float32 PCM → [{"start", "end", "text", "avg_logprob", "no_speech_prob"}] (offset초만큼 시각을 밀어서 반환)
+    - 풀에서 Whisper 인스턴스를 빌려 전사 (block=False면 모두 사용 중일 때 None)
+    """
+    cfg = resolve_profile(profile)
+    lang_opt = LANG_MAP.get(language, None)  # None이면 auto detect
+
+    with get_pool(cfg["model"], cfg["compute_type"]).acquire(block=block) as model:
+        if model is None:
+            return None
+        results = _decode(model, audio, lang_opt, cfg["beam_size"], cfg["patience"], vad_filter and cfg["vad_filter"])
+        if cfg["redecode"]:
+            results = _redecode_low_confidence(model, audio, results, cfg, lang_opt)
+
+    for r in results:
+        r["start"] += offset
+        r["end"] += offset
+    return results
+
+def transcribe_audio(input_path: str, language: str = None, profile: str = None):
+    audio = load_audio_as_numpy(input_path)
+    results = transcribe_array(audio, language=language, profile=profile)
     transcript = " ".join([r["text"] for r in results])
     return transcript, results
 # -----------------------------
 # 외부 호출용 (API는 그대로)
 # -----------------------------
-def stt_from_path(input_path: str, language: str = None):
-    transcript, segments = transcribe_audio(input_path, language=language)
-    return transcript, segments
\ No newline at end of file
+def stt_from_path(input_path: str, language: str = None, profile: str = None):
+    transcript, segments = transcribe_audio(input_path, language=language, profile=profile)
+    return transcript, segments
@@ -1,10 +1,16 @@
 import re, math, json, time 
 from typing import Optional, List, Dict, Any
-from utils.chroma_setup import get_collections, EF
+from utils.chroma_setup import get_collections, get_ef
 
-# 같은 EF/경로를 쓰는 컬렉션 핸들 공유
-# (앱 시작 시 lifespan에서 reset_chroma() 이후 get_collections()가 1회 호출돼 있으면 더 좋아요)
-_question, _answers, _feedback = get_collections()
+# 같은 EF/경로를 쓰는 컬렉션 핸들 공유 (chroma_setup에서 처음 쓰일 때 1회 열고, reset_chroma() 후엔 다시 엶)
+def _question():
+    return get_collections()[0]
+
+def _answers():
+    return get_collections()[1]
+
+def _feedback():
+    return get_collections()[2]
 
 def _norm(s: str) -> str:
     return re.sub(r"\s+", " ", (s or "").strip().lower())
@@ -94,7 +100,7 @@ def save_question(
     meta = _sanitize_metadata(meta_raw)
     print("🧾[save_question meta]", {k: (type(v).__name__, v) for k, v in meta.items()})  # 디버그
 
-    _question.add(
+    _question().add(
         ids=[_id],
         documents=[question or ""],   # 문서도 None 방지
         metadatas=[meta],             # ← 반드시 sanitize 후 넣기
@@ -110,7 +116,7 @@ def save_answer(
     subtype: Optional[str] = None,
 ) -> None:
     _id = f"{interviewId}:{seq}:a"
-    _answers.add(
+    _answers().add(
         ids=[_id],
         documents=[answer],
         metadatas=[{
@@ -162,9 +168,9 @@ def save_turn(
     doc = f"Q: {question}\nA: {answer}\n[Feedback] good: {good} | bad: {bad} | score: {score}"
 
     try:
-        existed = _feedback.get(ids=[_id])
+        existed = _feedback().get(ids=[_id])
         if existed and existed.get("ids"):
-            _feedback.update(
+            _feedback().update(
                 ids=[_id],
                 metadatas=[meta],
                 documents=[doc],
@@ -179,7 +185,7 @@ def save_turn(
     except Exception:
         pass
 
-    _feedback.add(
+    _feedback().add(
         ids=[_id],
         metadatas=[meta],
         documents=[doc],
@@ -217,7 +223,7 @@ def get_similar_question(
     where = _build_where(interviewId, subtype, job, min_seq)
 
     # ---------- 1) KNN 빠른 체크 ----------
-    res = _question.query(
+    res = _question().query(
         query_texts=[question],
         n_results=k,
         where=where,
@@ -262,7 +268,7 @@ def get_similar_question(
         return {"similar": False, "top_sim": 0.0, "match": None, "method": "knn", "hits": hits}
 
     # ---------- 2) 같은 where 범위에서 전수 비교 ----------
-    rows = _question.get(
+    rows = _question().get(
         where=where,
         include=["documents", "embeddings"],
         limit=10000, offset=0
@@ -275,7 +281,7 @@ def get_similar_question(
         print("⚠️ No documents found for this where-filter in Chroma")
         return {"similar": False, "top_sim": 0.0, "match": None, "method": "all", "hits": hits}
 
-    qvec = EF([question])[0]
+    qvec = get_ef()([question])[0]
     qvec = _tolist(qvec)
 
     best_sim, best_doc = 0.0, None
@@ -326,9 +332,9 @@ def save_feedback(
         meta.update(extra_meta)
 
     try:
-        existed = _feedback.get(ids=[_id])
+        existed = _feedback().get(ids=[_id])
         if existed and existed.get("ids"):
-            _feedback.update(
+            _feedback().update(
                 ids=[_id],
                 metadatas=[meta],
                 documents=[f"good:{good}\nbad:{bad}\nscore:{score}"],
@@ -337,14 +343,14 @@ def save_feedback(
     except Exception:
         pass
 
-    _feedback.add(
+    _feedback().add(
         ids=[_id],
         metadatas=[meta],
         documents=[f"good:{good}\nbad:{bad}\nscore:{score}"],
     )
 
 def list_feedback(interviewId: str) -> List[Dict[str, Any]]:
-    res = _feedback.get(
+    res = _feedback().get(
         where={"interviewId": interviewId},
         include=["metadatas"],
         limit=10000,
@@ -0,0 +1,64 @@
+import threading
+import time
+
+# 이름 → Lazy (healthz에서 구성요소별 준비 상태 조회용)
+COMPONENTS = {}
+
+
+class Lazy:
+    """
+    무거운 객체(모델, DB 클라이언트, LLM 클라이언트)를 처음 쓰일 때 한 번만 생성 (스레드 안전)
+    - import 시점에는 아무것도 로드하지 않음 → 서버 시작/테스트 import가 빠름
+    - 서버 시작 시 lifespan 워밍업에서 get()을 미리 호출해 첫 요청 지연을 없앰
+    - 생성 실패는 기록만 하고 다음 get()에서 다시 시도
+    - required=False면 healthz에 상태만 보여주고 준비 여부(503)에는 반영하지 않음
+      (워밍업하지 않고 요청이 처음 쓸 때 로드하는 구성요소)
+    """
+
+    def __init__(self, name: str, factory, required: bool = True):
+        self.name = name
+        self.required = required
+        self._factory = factory
+        self._value = None
+        self._loaded = False
+        self._error = None
+        self._load_secs = None
+        self._lock = threading.Lock()
+        COMPONENTS[name] = self
+
+    def get(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    t0 = time.perf_counter()
+                    try:
+                        self._value = self._factory()
+                    except Exception as e:
+                        self._error = str(e)
+                        raise
+                    self._load_secs = round(time.perf_counter() - t0, 3)
+                    self._error = None
+                    self._loaded = True
+        return self._value
+
+    def reset(self):
+        """다음 get()에서 다시 생성 (컬렉션 초기화 등)"""
+        with self._lock:
+            self._value = None
+            self._loaded = False
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def status(self) -> dict:
+        return {"ready": self._loaded, "required": self.required, "error": self._error, "load_secs": self._load_secs}
+
+
+def readiness() -> dict:
+    return {name: component.status() for name, component in COMPONENTS.items()}
+
+
+def is_ready(components: dict) -> bool:
+    """워밍업 대상(required) 구성요소가 모두 로드됐는지"""
+    return all(c["ready"] for c in components.values() if c["required"])
@@ -0,0 +1,280 @@
+"""
+tracking 처리량 벤치마크 (카메라/네트워크 불필요)
+
+- synthetic: 합성 랜드마크 스트림(깜빡임, 시선 이동, 고개 돌림, 손-얼굴 접촉 구간)으로
+  BlinkCounterVideo / GazeDirectionVideo / FaceTouchDetectorVideo / HeadPoseVideo 단계별 fps 측정
+- e2e: 테스트 영상(없으면 합성 영상 생성)으로 decode / FaceMesh / Hands / 전체 분석 fps 측정
+
+실행 (tracking/ 에서):
+    python -m benchmarks.bench_tracking synthetic --secs 120
+    python -m benchmarks.bench_tracking e2e --video sample.mp4 --mode balanced
+    python -m benchmarks.bench_tracking synthetic --json out.json --baseline base.json --tolerance 0.2
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from src.blink_detection.blink_detection import BlinkCounterVideo
+from src.gaze_detection.gaze_detection import GazeDirectionVideo
+from src.hand_detection.hand_detection import FaceTouchDetectorVideo
+from src.head_detection.head_detection import HeadPoseVideo
+from src.head_detection.pose_estimator import HeadPoseEstimator
+from src.utils.landmark_buffer import LandmarkBuffer, NUM_FACE_LANDMARKS
+
+W, H = 640, 480
+
+
+# ---------------------------------------------
+# 합성 랜드마크
+# ---------------------------------------------
+def base_face(rng) -> np.ndarray:
+    """정면을 보고 눈을 뜬 (478, 2) 정규화 좌표 얼굴"""
+    face = np.empty((NUM_FACE_LANDMARKS, 2), dtype=np.float32)
+    face[:, 0] = rng.uniform(0.35, 0.65, NUM_FACE_LANDMARKS)
+    face[:, 1] = rng.uniform(0.25, 0.75, NUM_FACE_LANDMARKS)
+
+    def eye(corner_a, corner_b, top, bottom, iris, x0, x1, y=0.45, half_open=0.012):
+        face[corner_a] = (x0, y)
+        face[corner_b] = (x1, y)
+        for i, idx in enumerate(top):
+            face[idx] = (x0 + (x1 - x0) * (i + 1) / 3, y - half_open)
+        for i, idx in enumerate(bottom):
+            face[idx] = (x0 + (x1 - x0) * (i + 1) / 3, y + half_open)
+        face[iris] = ((x0 + x1) / 2, y)
+
+    # BlinkCounterVideo.RIGHT_EYE_EAR = [33, 160, 158, 133, 153, 144]
+    eye(33, 133, (160, 158), (144, 153), 468, 0.42, 0.47)
+    # BlinkCounterVideo.LEFT_EYE_EAR = [362, 385, 387, 263, 373, 380]
+    eye(362, 263, (385, 387), (380, 373), 473, 0.53, 0.58)
+    return face
+
+
+def close_eyes(face):
+    for top, bottom in ((160, 144), (158, 153), (385, 380), (387, 373)):
+        face[top, 1] = face[bottom, 1] = 0.45
+    return face
+
+
+def fake_hand(x, y, rng):
+    """MediaPipe Hands 결과 형태(hand.landmark[i].x/.y)를 흉내낸 21점 손"""
+    pts = np.column_stack([rng.uniform(x - 0.04, x + 0.04, 21), rng.uniform(y - 0.05, y + 0.05, 21)])
+    return SimpleNamespace(landmark=[SimpleNamespace(x=float(px), y=float(py)) for px, py in pts])
+
+
+def synthetic_stream(secs: float, fps: float, seed: int = 0):
+    """
+    (buffer, hands) — hands[i]는 프레임 i의 손 목록(없으면 None)
+    - 3초마다 깜빡임, 30~40초 구간은 깜빡임 과다(10초에 12회 이상)
+    - 15초마다 1초 시선 왼쪽, 20초마다 1초 고개 돌림, 12초마다 1초 손으로 얼굴 터치
+    """
+    rng = np.random.default_rng(seed)
+    base = base_face(rng)
+    n = int(secs * fps)
+    buffer = LandmarkBuffer(capacity=n)
+    hands = []
+
+    for i in range(n):
+        t = i / fps
+        face = base.copy()
+
+        blink_period = 0.7 if 30.0 <= t % 60.0 < 40.0 else 3.0
+        if (t % blink_period) < 4 / fps:
+            close_eyes(face)
+        if 3.0 < t and (t % 15.0) < 1.0:
+            face[[468, 473], 0] -= 0.012       # 홍채를 눈 안쪽 왼쪽으로 → LOOK_LEFT
+        if 3.0 < t and (t % 20.0) < 1.0:
+            face[[1, 61, 199, 291], 0] += 0.05  # 코/입/턱을 밀어서 고개 돌림
+        if 3.0 < t and (t % 12.0) < 1.0:
+            hands.append([fake_hand(0.5, 0.6, rng)])
+        else:
+            hands.append(None)
+
+        face += rng.normal(0.0, 0.0005, face.shape).astype(np.float32)  # 미세 떨림
+        buffer.append(face, t)
+
+    return buffer, hands
+
+
+# ---------------------------------------------
+# 측정
+# ---------------------------------------------
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+def stage(results, name, frames, secs, **extra):
+    results[name] = {"frames": frames, "secs": round(secs, 4), "fps": round(frames / secs, 1) if secs > 0 else None, **extra}
+
+
+def bench_synthetic(secs: float, fps: float):
+    results = {}
+    (buffer, hands), gen_secs = timed(synthetic_stream, secs, fps)
+    n = len(buffer)
+    stage(results, "synthetic_generate", n, gen_secs)
+
+    # 손-얼굴 접촉 판정 (추출 단계에서 프레임마다 실행되는 부분)
+    touch = FaceTouchDetectorVideo(fps=fps)
+    t0 = time.perf_counter()
+    touching = np.fromiter(
+        (touch.detect_face_touch(lm, hand, W, H) for lm, hand in zip(buffer.landmarks, hands)),
+        dtype=bool, count=n,
+    )
+    stage(results, "face_touch_detect", n, time.perf_counter() - t0)
+    _, replay_secs = timed(touch.replay, touching, buffer.timestamps)
+    stage(results, "face_touch_replay", n, replay_secs, events=len(touch.events))
+
+    blink = BlinkCounterVideo(fps=fps)
+    _, blink_secs = timed(blink.replay, buffer.landmarks, W, H, buffer.timestamps)
+    stage(results, "blink", n, blink_secs, events=len(blink.events), blinks=blink.blink_counter)
+
+    estimator = HeadPoseEstimator()
+    poses, pose_secs = timed(estimator.predict_batch, buffer.landmarks)
+    stage(results, "head_pose_predict_batch", n, pose_secs)
+
+    # 비교용: 프레임당 predict 1회 (배치 이전 방식)
+    sample = min(n, 300)
+    t0 = time.perf_counter()
+    for lm in buffer.landmarks[:sample]:
+        estimator.predict(lm)
+    stage(results, "head_pose_predict_single", sample, time.perf_counter() - t0)
+
+    calib = poses[buffer.window(0.0, 3.0)].mean(axis=0)
+    head_pose = HeadPoseVideo()
+    head_pose.calibrate_center(*calib)
+    _, head_secs = timed(head_pose.replay, poses, buffer.timestamps)
+    stage(results, "head_pose", n, head_secs, events=len(head_pose.events))
+
+    gaze = GazeDirectionVideo(fps=fps)
+    gaze.calibrate_center(*calib)
+    _, gaze_secs = timed(gaze.replay, buffer.landmarks, poses, W, H, buffer.timestamps)
+    stage(results, "gaze", n, gaze_secs, events=len(gaze.events))
+
+    detector_secs = sum(results[k]["secs"] for k in ("face_touch_detect", "face_touch_replay", "blink", "head_pose_predict_batch", "head_pose", "gaze"))
+    stage(results, "detectors_total", n, detector_secs)
+    return results
+
+
+def write_test_video(path: str, secs: float, fps: float):
+    """얼굴 비슷한 도형이 움직이는 합성 영상 (FaceMesh 검출 여부와 무관하게 decode/그래프 비용 측정용)"""
+    import cv2
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (W, H))
+    for i in range(int(secs * fps)):
+        frame = np.full((H, W, 3), 90, dtype=np.uint8)
+        cx = W // 2 + int(20 * np.sin(i / fps))
+        cv2.ellipse(frame, (cx, H // 2), (90, 120), 0, 0, 360, (150, 180, 220), -1)
+        for ex in (cx - 35, cx + 35):
+            cv2.circle(frame, (ex, H // 2 - 25), 10, (255, 255, 255), -1)
+            cv2.circle(frame, (ex, H // 2 - 25), 4, (40, 30, 20), -1)
+        cv2.ellipse(frame, (cx, H // 2 + 50), (30, 10), 0, 0, 180, (60, 60, 160), 3)
+        writer.write(frame)
+    writer.release()
+
+
+def bench_e2e(video: str | None, secs: float, fps: float, mode: str | None):
+    import cv2
+    from src.main import run_all_analyses
+    from src.utils.analysis_mode import resolve_analysis_mode, frame_stride
+    from src.utils.graph_pool import get_face_mesh, get_hands
+    from src.utils.video_source import iter_capture_frames
+
+    results = {}
+    tmp = None
+    if video is None:
+        tmp = os.path.join(tempfile.gettempdir(), f"bench_tracking_{os.getpid()}.mp4")
+        write_test_video(tmp, secs, fps)
+        video = tmp
+
+    try:
+        _, mode_cfg = resolve_analysis_mode(mode)
+        cap = cv2.VideoCapture(video)
+        native_fps = cap.get(cv2.CAP_PROP_FPS) or fps
+        stride = frame_stride(native_fps, mode_cfg["fps"])
+
+        t0 = time.perf_counter()
+        frames = [cv2.cvtColor(f, cv2.COLOR_BGR2RGB) for f, _ in iter_capture_frames(cap, stride, mode_cfg["max_side"], native_fps)]
+        stage(results, "decode", len(frames), time.perf_counter() - t0)
+        cap.release()
+
+        face_mesh, hands = get_face_mesh(), get_hands()  # 그래프 초기화는 측정에서 제외
+        t0 = time.perf_counter()
+        detected = sum(1 for rgb in frames if face_mesh.process(rgb).multi_face_landmarks)
+        stage(results, "facemesh", len(frames), time.perf_counter() - t0, faces=detected)
+
+        t0 = time.perf_counter()
+        for rgb in frames:
+            hands.process(rgb)
+        stage(results, "hands", len(frames), time.perf_counter() - t0)
+
+        (result, error), total_secs = timed(run_all_analyses, video, mode)
+        stage(results, "run_all_analyses", len(frames), total_secs, error=error)
+    finally:
+        if tmp and os.path.exists(tmp):
+            os.remove(tmp)
+    return results
+
+
+# ---------------------------------------------
+# 출력 / 회귀 비교
+# ---------------------------------------------
+def print_table(results):
+    print(f"{'stage':<28}{'frames':>8}{'secs':>10}{'fps':>12}  extra")
+    for name, r in results.items():
+        extra = {k: v for k, v in r.items() if k not in ("frames", "secs", "fps")}
+        fps = f"{r['fps']:.1f}" if r["fps"] is not None else "-"
+        print(f"{name:<28}{r['frames']:>8}{r['secs']:>10.3f}{fps:>12}  {extra if extra else ''}")
+
+
+def compare_baseline(results, baseline_path: str, tolerance: float) -> list[str]:
+    """baseline 대비 fps가 tolerance 비율 이상 떨어진 단계 목록"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = []
+    for name, base in baseline.items():
+        cur = results.get(name)
+        if not cur or not cur.get("fps") or not base.get("fps"):
+            continue
+        if cur["fps"] < base["fps"] * (1.0 - tolerance):
+            regressions.append(f"{name}: {base['fps']:.1f} → {cur['fps']:.1f} fps")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="tracking 처리량 벤치마크")
+    parser.add_argument("target", choices=["synthetic", "e2e"])
+    parser.add_argument("--secs", type=float, default=60.0, help="합성 스트림/영상 길이(초)")
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--video", default=None, help="e2e: 사용할 영상 (없으면 합성 영상 생성)")
+    parser.add_argument("--mode", default=None, help="e2e: 분석 모드 (full/balanced/fast)")
+    parser.add_argument("--json", default=None, help="결과를 JSON으로 저장")
+    parser.add_argument("--baseline", default=None, help="비교할 이전 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="허용 fps 감소 비율 (기본 20%%)")
+    args = parser.parse_args(argv)
+
+    if args.target == "synthetic":
+        results = bench_synthetic(args.secs, args.fps)
+    else:
+        results = bench_e2e(args.video, args.secs, args.fps, args.mode)
+
+    print_table(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        regressions = compare_baseline(results, args.baseline, args.tolerance)
+        if regressions:
+            print("[REGRESSION]", *regressions, sep="\n  ")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,7 @@
 import cv2 as cv
 import numpy as np
 from collections import deque, Counter
-from src.utils.common import sec_to_timestamp
+from src.utils.common import sec_to_timestamp, secs_to_frames
 
 class BlinkCounterVideo:
     # 눈의 EAR(Eye Aspect Ratio) 계산에 사용할 랜드마크 인덱스
@@ -11,20 +11,13 @@ class BlinkCounterVideo:
     RIGHT_EYE = [33, 7, 163, 144, 145, 153, 154, 155, 133, 173, 157, 158, 159, 160, 161, 246]
     LEFT_EYE = [362, 382, 381, 380, 374, 373, 390, 249, 263, 466, 388, 387, 386, 385, 384, 398]
 
-    def __init__(self, ear_threshold=0.3, consec_frames=3, blink_limit_10s=10, penalty_per_excess=10):
+    def __init__(self, ear_threshold=0.3, consec_secs=0.1, blink_limit_10s=10, penalty_per_excess=10, fps=30):
         self.ear_threshold = ear_threshold # EAR 임계값 (이 값보다 작으면 눈이 감겼다고 판단)
-        self.consec_frames = consec_frames # 눈이 감겼다고 판정하기 위한 최소 연속 프레임 수
-        self.blink_counter = 0
-        self.frame_counter = 0
-
-        # 영상 시간(초)로만 관리
-        self.blink_times = deque() # t_sec 값들
+        self.consec_secs = consec_secs # 눈이 감겼다고 판정하기 위한 최소 지속 시간(초) — 30fps 기준 3프레임
+        self.set_fps(fps)
         self.blink_limit_10s = blink_limit_10s # 10초 동안 허용되는 최대 깜빡임 횟수
         self.penalty_per_excess = penalty_per_excess # 위반 시 감점 점수
-        self.blink_violations = [] # 위반 기록 저장
-
-        self.last_violation_time = -1e9   # 마지막 위반 기록된 t_sec
-        self.events = []                  # [{"time": float, "reason": str}, ...]
+        self.reset()
 
         self._unit_penalty = None     # 1회 위반당 감점(영상 길이 기반)
         self._unit_decimals = 1
@@ -34,16 +27,34 @@ class BlinkCounterVideo:
         self._unit_penalty = round(100.0 / total_secs, decimals)
         self._unit_decimals = decimals
 
-    def eye_aspect_ratio(self, eye_landmarks, landmarks):
+    def reset(self):
+        """깜빡임/위반 상태 초기화 → 같은 버퍼로 재실행할 때 사용"""
+        self.blink_counter = 0
+        self.frame_counter = 0
+
+        # 영상 시간(초)로만 관리
+        self.blink_times = deque() # t_sec 값들
+        self.blink_violations = [] # 위반 기록 저장
+
+        self.last_violation_time = -1e9   # 마지막 위반 기록된 t_sec
+        self.events = []                  # [{"time": float, "reason": str}, ...]
+
+    def set_fps(self, fps):
+        # 분석 fps가 바뀌어도(프레임 간격 분석) 같은 시간 기준이 되도록 프레임 수로 환산
+        self.consec_frames = secs_to_frames(self.consec_secs, fps)
+
+    def eye_aspect_ratio(self, eye_landmarks, points):
         """
         눈의 EAR(Eye Aspect Ratio) 계산
+        points: (478, 2) 픽셀 좌표 배열
         A, B: 세로 거리
         C: 가로 거리
         EAR = (A + B) / (2.0 * C)
         """
-        A = np.linalg.norm(np.array(landmarks[eye_landmarks[1]]) - np.array(landmarks[eye_landmarks[5]]))
-        B = np.linalg.norm(np.array(landmarks[eye_landmarks[2]]) - np.array(landmarks[eye_landmarks[4]]))
-        C = np.linalg.norm(np.array(landmarks[eye_landmarks[0]]) - np.array(landmarks[eye_landmarks[3]]))
+        p = points[eye_landmarks]  # (6, 2)
+        A = np.linalg.norm(p[1] - p[5])
+        B = np.linalg.norm(p[2] - p[4])
+        C = np.linalg.norm(p[0] - p[3])
         return (A + B) / (2.0 * C)
 
     def update_blink_count(self, ear, t_sec: float):
@@ -75,9 +86,17 @@ class BlinkCounterVideo:
 
         return blink_score, reasons_kor_text, penalty, total_violations
 
-    def process(self, landmarks, t_sec: float):
-        right_ear = self.eye_aspect_ratio(self.RIGHT_EYE_EAR, landmarks)
-        left_ear = self.eye_aspect_ratio(self.LEFT_EYE_EAR, landmarks)
+    def replay(self, landmarks, w, h, timestamps):
+        """버퍼에 모아둔 (N, 478, 2) 랜드마크를 처음부터 다시 판정"""
+        self.reset()
+        for lm, t_sec in zip(landmarks, timestamps):
+            self.process(lm, w, h, float(t_sec))
+
+    def process(self, landmarks, w, h, t_sec: float):
+        """landmarks: (478, 2) 정규화 좌표 배열"""
+        points = landmarks * np.array([w, h], dtype=np.float32)
+        right_ear = self.eye_aspect_ratio(self.RIGHT_EYE_EAR, points)
+        left_ear = self.eye_aspect_ratio(self.LEFT_EYE_EAR, points)
         ear = (right_ear + left_ear) / 2.0
 
         self.update_blink_count(ear, t_sec)
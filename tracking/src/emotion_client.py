@@ -0,0 +1,48 @@
+import json
+import os
+import urllib.error
+import urllib.request
+import uuid
+
+# emotion 서버 주소 (/analyze-all에서 샘플 프레임 묶음을 넘길 곳)
+EMOTION_URL = os.getenv("TRACKING_EMOTION_URL", "http://emotion-ai:8000")
+EMOTION_TIMEOUT_SECS = float(os.getenv("TRACKING_EMOTION_TIMEOUT_SECS", "300"))
+EMOTION_SAMPLE_FPS = 3  # emotion 서버의 SAMPLE_FPS와 동일
+
+
+def _multipart(fields: dict, files: dict):
+    """urllib용 multipart/form-data 본문 (외부 의존성 없이)"""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        if value is None:
+            continue
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode("utf-8")
+        )
+    for name, (filename, data, content_type) in files.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n".encode("utf-8") + data + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode("utf-8"))
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def analyze_frames_remote(bundle: bytes, interviewId: str, seq: int, duration_secs: float | None = None) -> dict:
+    """샘플 프레임 묶음(npz)을 emotion /analyze-frames로 보내고 응답 JSON 반환. 실패 시 RuntimeError"""
+    body, content_type = _multipart(
+        {"interviewId": interviewId, "seq": seq, "durationSeconds": duration_secs},
+        {"file": ("frames.npz", bundle, "application/octet-stream")},
+    )
+    req = urllib.request.Request(
+        f"{EMOTION_URL.rstrip('/')}/analyze-frames", data=body, headers={"Content-Type": content_type}, method="POST"
+    )
+    try:
+        with urllib.request.urlopen(req, timeout=EMOTION_TIMEOUT_SECS) as resp:
+            return json.loads(resp.read().decode("utf-8"))
+    except urllib.error.HTTPError as e:
+        detail = e.read().decode("utf-8", errors="replace")[:500]
+        raise RuntimeError(f"emotion 분석 실패 ({e.code}): {detail}")
+    except (urllib.error.URLError, TimeoutError, ValueError) as e:
+        raise RuntimeError(f"emotion 서버 호출 실패: {e}")
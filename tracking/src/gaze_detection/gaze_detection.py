@@ -1,16 +1,11 @@
-import cv2 as cv
-import mediapipe as mp
 import numpy as np
 from collections import Counter
-import pickle
-import os
-from src.utils.common import sec_to_timestamp
+from src.utils.common import sec_to_timestamp, secs_to_frames
 class GazeDirectionVideo:
     LEFT_EYE_LANDMARKS = [33, 133]
     RIGHT_EYE_LANDMARKS = [362, 263]
     LEFT_IRIS = [468]
     RIGHT_IRIS = [473]
-    HEAD_POSE_LANDMARKS = [1, 33, 61, 199, 263, 291, 362]
 
     REASON_TRANSLATIONS = {
         "LOOK_LEFT": "오른쪽 응시",
@@ -19,27 +14,16 @@ class GazeDirectionVideo:
         "LOOK_DOWN": "위쪽 응시"
     }
 
-    def __init__(self, penalty_per_violation=10, stable_frames_required=5, cooldown_secs=2.0):
+    def __init__(self, penalty_per_violation=10, stable_secs=5 / 30, cooldown_secs=2.0, fps=30):
         self.penalty_per_violation = penalty_per_violation
-        self.stable_frames_required = stable_frames_required
+        self.stable_secs = stable_secs  # 방향 확정에 필요한 유지 시간(초) — 30fps 기준 5프레임
+        self.set_fps(fps)
         self.cooldown_secs = cooldown_secs
-        self.violations = []
-        self.events = []
-
-        # 방향 안정화/중복 방지용 상태
-        self.current_dir = "FORWARD"
-        self.consec_count = 0
-        self.last_event_time_sec = -1e9  # 마지막 이벤트 발생 시각(초)
+        self.reset()
 
         self._unit_penalty = None
         self._unit_decimals = 1
 
-        BASE_DIR = os.path.dirname(__file__)
-        MODEL_PATH = os.path.join(BASE_DIR, "..", "head_detection", "model.pkl")
-        MODEL_PATH = os.path.abspath(MODEL_PATH)
-        with open(MODEL_PATH, "rb") as f:
-            self.head_pose_model = pickle.load(f)
-
         self.PITCH_TOL = 0.05
         self.YAW_TOL = 0.08
         self.ROLL_TOL = 0.08
@@ -48,24 +32,29 @@ class GazeDirectionVideo:
         self.YAW_CENTER = 0.0
         self.ROLL_CENTER = 0.0
 
+    def reset(self):
+        """이벤트/위반 상태만 초기화 (보정값은 유지) → 같은 버퍼로 재실행할 때 사용"""
+        self.violations = []
+        self.events = []
+
+        # 방향 안정화/중복 방지용 상태
+        self.current_dir = "FORWARD"
+        self.consec_count = 0
+        self.last_event_time_sec = -1e9  # 마지막 이벤트 발생 시각(초)
+
     def set_video_duration(self, total_secs: float, decimals: int = 1):
         total_secs = max(float(total_secs), 1e-6)
         self._unit_penalty = round(100.0 / total_secs, decimals)
         self._unit_decimals = decimals
 
+    def set_fps(self, fps):
+        self.stable_frames_required = secs_to_frames(self.stable_secs, fps)
+
     def calibrate_center(self, pitch, yaw, roll):
         self.PITCH_CENTER = pitch
         self.YAW_CENTER = yaw
         self.ROLL_CENTER = roll
 
-    def predict_head_pose(self, landmarks):
-        coords = []
-        for idx in self.HEAD_POSE_LANDMARKS:
-            lm = landmarks[idx]
-            coords.extend([lm.x, lm.y])
-        coords = np.array(coords).reshape(1, -1)
-        return self.head_pose_model.predict(coords)[0]
-
     def is_head_forward(self, pitch, yaw, roll):
         return (
             abs(pitch - self.PITCH_CENTER) < self.PITCH_TOL and
@@ -74,19 +63,14 @@ class GazeDirectionVideo:
         )
 
     def get_gaze_direction(self, landmarks, w, h):
-        left_iris = np.array([landmarks[self.LEFT_IRIS[0]].x * w,
-                              landmarks[self.LEFT_IRIS[0]].y * h])
-        left_eye_left = np.array([landmarks[self.LEFT_EYE_LANDMARKS[0]].x * w,
-                                  landmarks[self.LEFT_EYE_LANDMARKS[0]].y * h])
-        left_eye_right = np.array([landmarks[self.LEFT_EYE_LANDMARKS[1]].x * w,
-                                   landmarks[self.LEFT_EYE_LANDMARKS[1]].y * h])
-
-        right_iris = np.array([landmarks[self.RIGHT_IRIS[0]].x * w,
-                               landmarks[self.RIGHT_IRIS[0]].y * h])
-        right_eye_left = np.array([landmarks[self.RIGHT_EYE_LANDMARKS[0]].x * w,
-                                   landmarks[self.RIGHT_EYE_LANDMARKS[0]].y * h])
-        right_eye_right = np.array([landmarks[self.RIGHT_EYE_LANDMARKS[1]].x * w,
-                                    landmarks[self.RIGHT_EYE_LANDMARKS[1]].y * h])
+        scale = np.array([w, h], dtype=np.float32)
+        left_iris = landmarks[self.LEFT_IRIS[0]] * scale
+        left_eye_left = landmarks[self.LEFT_EYE_LANDMARKS[0]] * scale
+        left_eye_right = landmarks[self.LEFT_EYE_LANDMARKS[1]] * scale
+
+        right_iris = landmarks[self.RIGHT_IRIS[0]] * scale
+        right_eye_left = landmarks[self.RIGHT_EYE_LANDMARKS[0]] * scale
+        right_eye_right = landmarks[self.RIGHT_EYE_LANDMARKS[1]] * scale
 
         left_ratio = (np.linalg.norm(left_iris - left_eye_left) /
                       np.linalg.norm(left_eye_right - left_eye_left))
@@ -110,8 +94,14 @@ class GazeDirectionVideo:
         else:
             return "FORWARD"
 
-    def process(self, landmarks, w, h, t_sec: float):
-        pitch, yaw, roll = self.predict_head_pose(landmarks)
+    def replay(self, landmarks, poses, w, h, timestamps):
+        """버퍼의 (N, 478, 2) 랜드마크 + HeadPoseEstimator로 구한 (N, 3) 포즈를 처음부터 다시 판정"""
+        self.reset()
+        for lm, pose, t_sec in zip(landmarks, poses, timestamps):
+            self.process(lm, pose, w, h, float(t_sec))
+
+    def process(self, landmarks, pose, w, h, t_sec: float):
+        pitch, yaw, roll = pose
 
         # '정면'일 때만 시선판정 (고개가 돌아가면 시선 무시)
         if not self.is_head_forward(pitch, yaw, roll):
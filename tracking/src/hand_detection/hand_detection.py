@@ -1,62 +1,62 @@
 import numpy as np
 from collections import deque
-from src.utils.common import sec_to_timestamp
+from src.utils.common import sec_to_timestamp, secs_to_frames
+from src.utils.landmark_buffer import landmarks_to_array
 class FaceTouchDetectorVideo:
-    def __init__(self, penalty_per_violation=10, fps=30):
+    def __init__(self, penalty_per_violation=10, fps=30, touch_secs=0.5):
         self.penalty_per_violation = penalty_per_violation
-        self.frame_threshold = int(fps * 0.5)  # 0.5초 이상 터치 시 감점
+        self.touch_secs = touch_secs  # 0.5초 이상 터치 시 감점
+        self.set_fps(fps)
+        self.reset()
 
+        self._unit_penalty = None
+        self._unit_decimals = 1
+
+    def reset(self):
+        """터치 연속 구간/위반 상태 초기화 → 같은 버퍼로 재실행할 때 사용"""
         self.touch_frames = 0
         self.in_touch = False  # 연속 터치 구간 중복 카운트 방지
 
         self.penalized_sections = 0
         self.events = []  # [{"time":"MM:SS","reason":"손 움직임"}]
 
-        self._unit_penalty = None
-        self._unit_decimals = 1
-
     def set_video_duration(self, total_secs: float, decimals: int = 1):
         total_secs = max(float(total_secs), 1e-6)
         self._unit_penalty = round(100.0 / total_secs, decimals)
         self._unit_decimals = decimals
 
     def set_fps(self, fps):
-        self.frame_threshold = int(fps * 0.5)
+        self.frame_threshold = secs_to_frames(self.touch_secs, fps)
 
     def detect_face_touch(self, face_landmarks, hand_landmarks, w, h) -> bool:
         """
+        face_landmarks: (478, 2) 정규화 좌표 배열, hand_landmarks: MediaPipe Hands 결과
         1단계: 얼굴/손 바운딩박스가 겹치는지 빠르게 검사 (겹치지 않으면 즉시 False)
         2단계: 겹칠 때만 세밀 최소거리 계산
         """
-        if not face_landmarks or not hand_landmarks:
+        if face_landmarks is None or not hand_landmarks:
             return False
-        
+
+        scale = np.array([w, h], dtype=np.float32)
+        face_points = face_landmarks * scale  # (F,2) 픽셀 좌표
+
         # --- 얼굴 bbox (pad로 여유를 줘서 민감도 확보) ---
-        xs = [pt[0] for pt in face_landmarks.values()]
-        ys = [pt[1] for pt in face_landmarks.values()]
-        fx1, fy1, fx2, fy2 = min(xs), min(ys), max(xs), max(ys)
+        fx1, fy1 = face_points.min(axis=0)
+        fx2, fy2 = face_points.max(axis=0)
         pad = 30
         fx1 -= pad; fy1 -= pad; fx2 += pad; fy2 += pad
 
-        face_points = None
-
         for hand in hand_landmarks:
             # 손 bbox
-            hx = [lm.x * w for lm in hand.landmark]
-            hy = [lm.y * h for lm in hand.landmark]
-            hx1, hy1, hx2, hy2 = min(hx), min(hy), max(hx), max(hy)
+            hand_points = landmarks_to_array(hand.landmark) * scale  # (H,2)
+            hx1, hy1 = hand_points.min(axis=0)
+            hx2, hy2 = hand_points.max(axis=0)
 
             # 빠른 충돌 검사: bbox가 안 겹치면 스킵
             if hx2 < fx1 or hx1 > fx2 or hy2 < fy1 or hy1 > fy2:
                 continue
 
-            # 여기서만 세밀 최소거리 계산
-            if face_points is None:
-                face_points = np.array([[pt[0], pt[1]] for pt in face_landmarks.values()])  # (F,2)
-
-            hand_points = np.array([[x, y] for x, y in zip(hx, hy)], dtype=float)  # (H,2)
-
-            # 모든 조합 최소거리 (H x F)
+            # 겹칠 때만 세밀 최소거리 계산: 모든 조합 최소거리 (H x F)
             diffs = face_points[None, :, :] - hand_points[:, None, :]
             dists = np.linalg.norm(diffs, axis=2)
             dmin = np.min(dists)
@@ -67,8 +67,15 @@ class FaceTouchDetectorVideo:
         return False
 
     def process(self, face_landmarks, hand_landmarks, w, h, t_sec: float):
-        touching = self.detect_face_touch(face_landmarks, hand_landmarks, w, h)
+        self.update(self.detect_face_touch(face_landmarks, hand_landmarks, w, h), t_sec)
+
+    def replay(self, touching, timestamps):
+        """버퍼에 모아둔 프레임별 터치 여부(N,)를 처음부터 다시 판정"""
+        self.reset()
+        for flag, t_sec in zip(touching, timestamps):
+            self.update(bool(flag), float(t_sec))
 
+    def update(self, touching: bool, t_sec: float):
         if touching:
             self.touch_frames += 1
             # 아직 터치 구간으로 기록되지 않았고, 0.5초 이상 연속 터치면 1회 인정
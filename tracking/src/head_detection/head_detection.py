@@ -1,6 +1,3 @@
-import numpy as np
-import pickle
-import os
 from collections import Counter
 from src.utils.common import sec_to_timestamp
 class HeadPoseVideo:
@@ -14,8 +11,6 @@ class HeadPoseVideo:
         "Not Facing Forward": "정면 응시 아님"
     }
 
-    LANDMARK_IDX = [1, 33, 61, 199, 263, 291, 362]
-
     def __init__(self, pitch_tol=0.01, yaw_tol=0.02, roll_tol=0.02, penalty_per_violation=5, cooldown_secs=2.0):
         self.PITCH_TOL = pitch_tol
         self.YAW_TOL = yaw_tol
@@ -28,20 +23,19 @@ class HeadPoseVideo:
         self.roll_center = 0
         self.calibrated = False
 
+        self.reset()
+
+        self._unit_penalty = None
+        self._unit_decimals = 1
+
+    def reset(self):
+        """이벤트/위반 상태만 초기화 (보정값은 유지) → 같은 버퍼로 재실행할 때 사용"""
         self.prev_reason = None  # 연속 중복 방지용
         self.last_event_time_sec = -1e9  # 마지막 이벤트 발생 시각(초)
 
         self.penalty_reasons_list = []
         self.events = []  # [{"time":"MM:SS","reason":"고개 움직임"}]'
 
-        self._unit_penalty = None
-        self._unit_decimals = 1
-
-        # 모델 로드
-        model_path = os.path.join(os.path.dirname(__file__), "model.pkl")
-        with open(model_path, "rb") as f:
-            self.model = pickle.load(f)
-
     def set_video_duration(self, total_secs: float, decimals: int = 1):
         total_secs = max(float(total_secs), 1e-6)
         self._unit_penalty = round(100.0 / total_secs, decimals)
@@ -53,19 +47,18 @@ class HeadPoseVideo:
         self.roll_center = roll
         self.calibrated = True
 
-    def _predict_pose(self, landmarks):
-        coords = []
-        for idx in self.LANDMARK_IDX:
-            lm = landmarks[idx]
-            coords.extend([lm.x, lm.y])
-        coords = np.array(coords).reshape(1, -1)
-        return self.model.predict(coords)[0]  # pitch, yaw, roll
+    def replay(self, poses, timestamps):
+        """HeadPoseEstimator.predict_batch로 구한 (N, 3) 포즈를 처음부터 다시 판정"""
+        self.reset()
+        for pose, t_sec in zip(poses, timestamps):
+            self.process(pose, float(t_sec))
 
-    def process(self, landmarks, t_sec: float):
+    def process(self, pose, t_sec: float):
+        """pose: (pitch, yaw, roll) — HeadPoseEstimator 예측값"""
         if not self.calibrated:
             return
 
-        pitch, yaw, roll = self._predict_pose(landmarks)
+        pitch, yaw, roll = pose
         pitch_diff = pitch - self.pitch_center
         yaw_diff = yaw - self.yaw_center
         roll_diff = roll - self.roll_center
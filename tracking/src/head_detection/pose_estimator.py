@@ -0,0 +1,34 @@
+import numpy as np
+import pickle
+import os
+
+MODEL_PATH = os.path.join(os.path.dirname(__file__), "model.pkl")
+
+
+class HeadPoseEstimator:
+    """
+    model.pkl 회귀모델로 (pitch, yaw, roll)을 예측하는 공용 단계
+    - HeadPoseVideo/GazeDirectionVideo가 같은 포즈를 쓰므로 프레임당 한 번만 예측
+    - 버퍼 전체를 (N, 14) 행렬 하나로 묶어 predict 1회로 처리 (sklearn 호출 오버헤드 제거)
+    """
+
+    LANDMARK_IDX = [1, 33, 61, 199, 263, 291, 362]
+
+    def __init__(self, model_path: str = MODEL_PATH):
+        with open(model_path, "rb") as f:
+            self.model = pickle.load(f)
+
+    def features(self, landmarks: np.ndarray) -> np.ndarray:
+        """(N, 478, 2) 정규화 좌표 → (N, 14) [x1, y1, x2, y2, ...] 특징 행렬"""
+        landmarks = np.asarray(landmarks)
+        return landmarks[:, self.LANDMARK_IDX, :].reshape(len(landmarks), -1)
+
+    def predict_batch(self, landmarks: np.ndarray) -> np.ndarray:
+        """(N, 478, 2) → (N, 3) pitch, yaw, roll"""
+        if len(landmarks) == 0:
+            return np.empty((0, 3), dtype=np.float64)
+        return np.asarray(self.model.predict(self.features(landmarks)), dtype=np.float64)
+
+    def predict(self, landmarks: np.ndarray) -> np.ndarray:
+        """(478, 2) 한 프레임 → (3,) pitch, yaw, roll"""
+        return self.predict_batch(np.asarray(landmarks)[None])[0]
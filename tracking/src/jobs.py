@@ -0,0 +1,160 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import threading
+import time
+import urllib.request
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from src.utils.graph_pool import warmup
+
+# 분석 워커 프로세스 수 (0/미설정이면 코어 수)
+WORKERS = int(os.getenv("TRACKING_WORKERS", "0") or 0) or (os.cpu_count() or 1)
+# 완료된 작업 결과 보관 시간(초)
+JOB_TTL_SECS = float(os.getenv("TRACKING_JOB_TTL_SECS", "3600"))
+CALLBACK_TIMEOUT_SECS = float(os.getenv("TRACKING_CALLBACK_TIMEOUT_SECS", "10"))
+# 워커가 모두 바쁠 때 대기시킬 최대 작업 수 (넘으면 PoolOverloaded → 503), 0/미설정이면 워커 수 x 4
+MAX_QUEUE = int(os.getenv("TRACKING_MAX_QUEUE", "0") or 0) or WORKERS * 4
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# 입장 제어: 풀에 들어간(실행 중 + 대기 중) 작업 수
+_pending = 0
+_rejected = 0
+_completed = 0
+_pending_lock = threading.Lock()
+
+
+class PoolOverloaded(Exception):
+    """분석 대기열이 가득 참 → 503 (잠시 후 재시도)"""
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """
+    분석용 프로세스 풀 (최초 사용 시 생성). MediaPipe는 fork 안전하지 않아 spawn 사용
+    - 워커 시작 시 FaceMesh/Hands 그래프와 head pose 모델을 미리 만들어 요청마다 재사용
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=warmup,
+            )
+        return _executor
+
+
+def shutdown_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def admit(n: int = 1):
+    """
+    작업 n개를 풀에 넣을 자리 예약 (구간 병렬 분석은 구간 수만큼 한 번에 예약)
+    - 실행 중 + 대기 중이 WORKERS + MAX_QUEUE를 넘으면 PoolOverloaded
+    - 예약한 자리는 run_in_pool(..., admitted=True)이 끝날 때 반납
+    """
+    global _pending, _rejected
+    with _pending_lock:
+        if _pending + n > WORKERS + MAX_QUEUE:
+            _rejected += 1
+            raise PoolOverloaded("분석 대기열이 가득 찼습니다. 잠시 후 다시 시도하세요.")
+        _pending += n
+
+
+def is_overloaded() -> bool:
+    with _pending_lock:
+        return _pending >= WORKERS + MAX_QUEUE
+
+
+def pool_stats() -> dict:
+    with _pending_lock:
+        return {
+            "workers": WORKERS,
+            "max_queue": MAX_QUEUE,
+            "running": min(_pending, WORKERS),
+            "queue_depth": max(_pending - WORKERS, 0),
+            "rejected_total": _rejected,
+            "completed_total": _completed,
+        }
+
+
+async def run_in_pool(func, *args, admitted: bool = False):
+    """이벤트 루프를 막지 않고 프로세스 풀에서 func(*args) 실행 (admitted가 아니면 여기서 자리 예약)"""
+    global _pending, _completed
+    if not admitted:
+        admit()
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(get_executor(), func, *args)
+    except BrokenProcessPool:
+        # 워커가 죽으면(네이티브 크래시 등) 풀을 버리고 다음 요청부터 새로 생성
+        print("[POOL] broken process pool → recreate on next request")
+        shutdown_executor()
+        raise
+    finally:
+        with _pending_lock:
+            _pending -= 1
+            _completed += 1
+
+
+class JobStore:
+    """
+    메모리 기반 작업 상태 저장소 (컨테이너 1개 기준)
+    - status: pending → done | failed
+    - 끝난 작업은 JOB_TTL_SECS 이후 정리
+    """
+
+    def __init__(self, ttl_secs: float = JOB_TTL_SECS):
+        self.ttl_secs = ttl_secs
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def create(self, **meta) -> str:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._purge()
+            self._jobs[job_id] = {"jobId": job_id, "status": "pending", "createdAt": time.time(), **meta}
+        return job_id
+
+    def update(self, job_id: str, **fields):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields, updatedAt=time.time())
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _purge(self):
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job["status"] != "pending" and now - job.get("updatedAt", now) > self.ttl_secs
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+def post_callback(url: str, payload: dict):
+    """작업 완료 결과를 callbackUrl로 POST (JSON). 실패해도 작업 상태에는 영향 없음"""
+    req = urllib.request.Request(
+        url,
+        data=json.dumps(payload, ensure_ascii=False).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(req, timeout=CALLBACK_TIMEOUT_SECS) as resp:
+            print("[CALLBACK]", url, resp.status)
+    except Exception as e:
+        print("[CALLBACK_ERR]", url, str(e))
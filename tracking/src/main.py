@@ -1,19 +1,46 @@
-from fastapi import FastAPI, File, UploadFile, Form
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, File, UploadFile, Form, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 import cv2
-import mediapipe as mp
 import numpy as np
 from src.blink_detection.blink_detection import BlinkCounterVideo
 from src.gaze_detection.gaze_detection import GazeDirectionVideo
 from src.hand_detection.hand_detection import FaceTouchDetectorVideo
 from src.head_detection.head_detection import HeadPoseVideo
+from src.utils.landmark_buffer import LandmarkBuffer, landmarks_to_array
+from src.utils.analysis_mode import resolve_analysis_mode, frame_stride, threshold_fps
+from src.utils.video_source import iter_capture_frames, iter_ffmpeg_frames, probe_video, scaled_size, resize_max_side
+from src.utils.common import secs_to_frames
+from src.utils.graph_pool import get_face_mesh, get_hands, get_pose_estimator, discard_graphs
+from src.jobs import JobStore, run_in_pool, shutdown_executor, post_callback, WORKERS, admit, is_overloaded, pool_stats, PoolOverloaded
+from src.utils.metrics import StageTimer, REQUEST_SECONDS, observe_timings, render_metrics
+from src.utils.result_cache import ResultCache, make_cache_key
+from src.utils.frame_bundle import FrameBundleSampler
+from src.emotion_client import analyze_frames_remote, EMOTION_SAMPLE_FPS
+from src.utils.upload import UploadRejected, content_length_exceeded, check_duration, save_upload, saved_upload, remove_file
+from contextlib import asynccontextmanager
+import asyncio
 import tempfile
-import shutil
+import time
 import os
 import uuid
 import subprocess
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    shutdown_executor()
+
+app = FastAPI(lifespan=lifespan)
+
+@app.middleware("http")
+async def reject_oversized_upload(request: Request, call_next):
+    # Content-Length가 제한을 넘으면 본문을 받기(멀티파트 파싱) 전에 413
+    if request.method == "POST" and content_length_exceeded(request.headers.get("content-length")):
+        return JSONResponse(content={"error": "업로드 크기 초과"}, status_code=413)
+    return await call_next(request)
+
+jobs = JobStore()
+_background_tasks = set()  # 실행 중인 작업 task 참조 유지 (GC 방지)
 
 # webm → mp4 변환 유틸
 def transcode_to_mp4(src_path: str) -> str:
@@ -31,175 +58,179 @@ def transcode_to_mp4(src_path: str) -> str:
         raise RuntimeError("ffmpeg 변환 실패")
     return dst_path
 
-def probe_needs_transcode(path: str, sample_frames: int = 10) -> bool:
-    cap = cv2.VideoCapture(path)
-    if not cap.isOpened():
-        cap.release(); return True
-    fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
-    frames_meta = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
-    # 메타 이상
-    if fps > 120 or fps <= 0 or frames_meta < 0:
-        cap.release(); return True
-    # POS_MSEC 증가 여부 체크
-    prev = -1.0; progressed = False
-    for _ in range(sample_frames):
-        ok, _ = cap.read()
-        if not ok: break
-        t = cap.get(cv2.CAP_PROP_POS_MSEC) or 0.0
-        if t > prev:
-            progressed = True
-        prev = t
-    cap.release()
-    return not progressed
-
-def measure_center(video_path, model, predictor_func, calibrate_func, label=""):
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        print(f"[CALIB:{label}] 영상 열기 실패")
-        return
-
-    mp_face_mesh = mp.solutions.face_mesh
-    face_mesh = mp_face_mesh.FaceMesh(
-        max_num_faces=1,
-        refine_landmarks=True,
-        min_detection_confidence=0.5,
-        min_tracking_confidence=0.5
-    )
-
-    total_pitch = total_yaw = total_roll = 0.0
-    count = 0
-    start_time = None
-
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        t_sec = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
-        if start_time is None:
-            start_time = t_sec
-
-        # 3초까지만 사용
-        if t_sec - start_time > 3.0:
-            break
-
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = face_mesh.process(rgb)
-        if results.multi_face_landmarks:
-            landmarks = results.multi_face_landmarks[0].landmark
-            pitch, yaw, roll = predictor_func(landmarks)
-            total_pitch += pitch
-            total_yaw += yaw
-            total_roll += roll
-            count += 1
-
-    face_mesh.close()
-    cap.release()
-
-    if count > 0:
-        calibrate_func(
-            total_pitch / count,
-            total_yaw / count,
-            total_roll / count
-        )
-    print(f"[CALIB:{label}] frames_used={count}, duration~{(t_sec-start_time):.2f}s")
-
-def run_all_analyses(video_path):
+def probe_needs_transcode(meta: dict) -> bool:
+    """
+    ffprobe 메타만으로 OpenCV 디코딩이 불안정한 영상인지 판단 (프레임 디코딩 없음)
+    - fps 메타 이상(0 이하/120 초과) 또는 컨테이너 길이 정보 없음(브라우저 MediaRecorder webm 등)
+      → 이런 영상은 POS_MSEC가 증가하지 않거나 프레임 수 메타가 틀려서 ffmpeg 경로로 처리
+    """
+    fps = meta["fps"]
+    return fps <= 0 or fps > 120 or not meta["duration"]
+
+CALIB_SECS = 3.0  # 센터 보정에 사용할 영상 앞부분 길이(초)
+# 메타/타임스탬프가 비정상인 영상의 디코딩 방식
+# - pipe: ffmpeg → rawvideo 파이프로 바로 분석 (기본)
+# - transcode: 기존처럼 libx264 mp4로 변환 후 OpenCV로 다시 디코딩
+DECODE_MODE = os.getenv("TRACKING_DECODE_MODE", "pipe")
+PIPE_FPS = 30.0  # 파이프 디코딩 기본 fps (transcode의 -r 30과 동일)
+HANDS_INTERVAL_SECS = 0.1  # Hands는 이 간격마다 한 번만 실행 (30fps 기준 3프레임)
+# 긴 영상 구간 병렬 분석: 요청에 parallel이 없을 때 기본값 / 구간 최소 길이(초)
+PARALLEL_DEFAULT = os.getenv("TRACKING_PARALLEL", "0") == "1"
+SEGMENT_MIN_SECS = float(os.getenv("TRACKING_SEGMENT_MIN_SECS", "60"))
+# 결과 캐시: 같은 영상 재전송(타임아웃 재시도 등) 시 디코딩 없이 이전 결과 반환
+# - 메모리 LRU 항목 수(0이면 끔) / 디스크 캐시 디렉터리(미설정이면 메모리만) / 디스크 최대 항목 수
+CACHE_SIZE = int(os.getenv("TRACKING_CACHE_SIZE", "128"))
+CACHE_DIR = os.getenv("TRACKING_CACHE_DIR")
+CACHE_DISK_MAX = int(os.getenv("TRACKING_CACHE_DISK_MAX", "4096"))
+
+result_cache = ResultCache(CACHE_SIZE, CACHE_DIR, CACHE_DISK_MAX)
+_inflight = {}  # 캐시 키 → 분석 중인 task (동시에 들어온 같은 영상은 한 번만 분석)
+
+def calibrate_from_poses(poses, calibrators, label=""):
+    """첫 구간에서 모은 (pitch, yaw, roll) 평균으로 여러 모듈을 한 번에 보정"""
+    if len(poses):
+        pitch, yaw, roll = np.mean(np.asarray(poses, dtype=float), axis=0)
+        for calibrate_func in calibrators:
+            calibrate_func(pitch, yaw, roll)
+    print(f"[CALIB:{label}] frames_used={len(poses)}")
+
+def open_capture_frames(video_path, mode_cfg, meta, start_sec=0.0, end_sec=None):
+    """
+    OpenCV 디코딩 경로: (frames, w, h, analysis_fps) 또는 에러 메시지
+    - analysis_fps: 프레임 수 임계값 환산용 fps (full 모드는 기존처럼 30 고정, threshold_fps 참고)
+    - 메타는 probe_video 결과를 그대로 사용 (첫 프레임 읽기/되감기 없이 바로 디코딩 시작)
+    - 프레임이 하나도 안 나오면 extract_features 이후 프레임 수 0으로 에러 처리
+    """
     cap = cv2.VideoCapture(video_path)
     print("[OPEN]", "path:", video_path, "opened:", cap.isOpened())
     if not cap.isOpened():
         return None, "영상 열기 실패"
 
-    w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH) or 0)
-    h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT) or 0)
-    fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
-    frames_meta = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
-    print("[META]", f"size=({w}x{h}) fps={fps} frames_meta={frames_meta}")
-
-    ok, frame0 = cap.read()
-    print("[FIRST_READ]", "ok:", ok, "frame_none:", frame0 is None)
-    if not ok or frame0 is None:
-        return None, "프레임 읽기 실패(코덱/파일 문제 가능)"
+    w, h, fps = meta["width"], meta["height"], meta["fps"]
+    print("[META]", f"size=({w}x{h}) fps={fps} frames_meta={meta['frames']} duration={meta['duration']}")
+
+    if start_sec > 0:
+        cap.set(cv2.CAP_PROP_POS_MSEC, start_sec * 1000.0)
+
+    # 목표 fps에 맞춰 프레임 간격 분석 (건너뛰는 프레임은 grab만)
+    native_fps = fps if 0 < fps <= 120 else 30.0
+    stride = frame_stride(native_fps, mode_cfg["fps"])
+
+    def frames():
+        try:
+            for frame, t_sec in iter_capture_frames(cap, stride, mode_cfg["max_side"], native_fps, start_sec):
+                # 구간 분석: seek가 조금 앞에 떨어진 프레임은 버리고 끝 시각에서 멈춤
+                if t_sec < start_sec:
+                    continue
+                if end_sec is not None and t_sec >= end_sec:
+                    break
+                yield frame, t_sec
+        finally:
+            cap.release()
+
+    return (frames(), w, h, threshold_fps(mode_cfg, native_fps / stride)), None
+
+def open_pipe_frames(video_path, mode_cfg, meta, start_sec=0.0, end_sec=None):
+    """ffmpeg 파이프 경로: 재인코딩 없이 고정 fps/분석 해상도 rawvideo를 바로 읽음"""
+    w, h = meta["width"], meta["height"]
+    print("[OPEN:PIPE]", "path:", video_path, "size:", (w, h))
+    analysis_fps = mode_cfg["fps"] or PIPE_FPS
+    duration = (end_sec - start_sec) if end_sec is not None else None
+    frames = iter_ffmpeg_frames(video_path, analysis_fps, scaled_size(w, h, mode_cfg["max_side"]), start_sec, duration)
+    return (frames, w, h, threshold_fps(mode_cfg, analysis_fps)), None
+
+def extract_features(frames, w, h, analysis_fps, timer=None, timed=False):
+    """
+    1단계(무거운 부분): 디코딩 + FaceMesh/Hands → LandmarkBuffer
+    - 프레임별 랜드마크, 손-얼굴 접촉 여부, 타임스탬프만 모으고 판정은 score_features에서
+    - 반환: (buffer, stats) — stats: 디코딩 프레임 수, 첫 프레임 시각, 최대 시각
+    - timer: decode(BGR→RGB 포함) / facemesh / hands / face_touch 시간 누적
+    - timed: frames가 이미 단계별로 시간을 재는 스트림이면 True (decode 중복 집계 방지)
+    """
+    timer = timer or StageTimer()
+    face_mesh = get_face_mesh()  # 워커별로 초기화된 그래프 재사용
+    hands = get_hands()
+    face_touch = FaceTouchDetectorVideo(fps=analysis_fps)  # 접촉 판정(detect_face_touch)만 사용
+
+    hands_every = secs_to_frames(HANDS_INTERVAL_SECS, analysis_fps)
+    last_hand_res = None
 
-    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+    frame_idx = 0
+    max_time = 0.0
+    start_time = None
+    buffer = LandmarkBuffer()
 
-    # 모듈 생성
-    blink = BlinkCounterVideo()
-    gaze = GazeDirectionVideo()
-    face_touch = FaceTouchDetectorVideo()
+    try:
+        for frame, t_sec in (frames if timed else timer.iterate("decode", frames)):
+            frame_idx += 1
+            max_time = max(max_time, t_sec)
+            if start_time is None:
+                start_time = t_sec
+
+            # FaceMesh 처리
+            with timer.stage("decode"):
+                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            with timer.stage("facemesh"):
+                face_results = face_mesh.process(rgb)
+                if not face_results.multi_face_landmarks:
+                    continue
+
+                # 프레임당 한 번만 (478, 2) 배열로 변환해서 모든 모듈이 공유
+                landmarks = landmarks_to_array(face_results.multi_face_landmarks[0].landmark)
+
+            if (frame_idx % hands_every) == 0:
+                with timer.stage("hands"):
+                    last_hand_res = hands.process(rgb)
+            hand_lms = (last_hand_res.multi_hand_landmarks if (last_hand_res and last_hand_res.multi_hand_landmarks) else None)
+
+            with timer.stage("face_touch"):
+                touching = face_touch.detect_face_touch(landmarks, hand_lms, w, h)
+            buffer.append(landmarks, t_sec, touching)
+    except Exception:
+        discard_graphs()
+        raise
+
+    return buffer, {"frames": frame_idx, "start_time": start_time, "max_time": max_time}
+
+def score_features(buffer, stats, w, h, analysis_fps, timer=None):
+    """
+    2단계(가벼운 부분): 버퍼 전체를 각 모듈에 시간순으로 재생해서 점수/이벤트 계산
+    - 버퍼만 있으면 되므로 구간별로 나눠 추출한 버퍼를 이어 붙여도 같은 상태 머신으로 판정
+    - 결과의 "timings"에 timer까지의 단계별 소요 시간(초)을 담아 반환
+    """
+    timer = timer or StageTimer()
+    # 모듈 생성 (프레임 수 임계값은 초 단위 → 분석 fps로 환산)
+    blink = BlinkCounterVideo(fps=analysis_fps)
+    gaze = GazeDirectionVideo(fps=analysis_fps)
+    face_touch = FaceTouchDetectorVideo(fps=analysis_fps)
     head_pose = HeadPoseVideo()
-    face_touch.set_fps(30.0)  # 기본값 30으로 두고 POS_MSEC으로 시간 계산
+    pose_estimator = get_pose_estimator()  # HeadPose/Gaze 공용 포즈 예측 (프로세스당 1회 로드)
 
-    # 센터 보정 (고개/시선)  ← 이건 영상 경로로 새 cap 열어서
-    measure_center(video_path, head_pose, head_pose._predict_pose, head_pose.calibrate_center, "HeadPose")
-    measure_center(video_path, gaze, gaze.predict_head_pose, gaze.calibrate_center, "Gaze")
+    with timer.stage("blink"):
+        blink.replay(buffer.landmarks, w, h, buffer.timestamps)
+    with timer.stage("face_touch"):
+        face_touch.replay(buffer.touching, buffer.timestamps)
 
-    # 기존 cap 폐기하고 메인 루프용으로 새 cap 열기
-    cap.release()
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        return None, "영상 재오픈 실패"
-
-    # 솔루션 초기화
-    mp_face_mesh = mp.solutions.face_mesh
-    face_mesh = mp_face_mesh.FaceMesh(
-        max_num_faces=1,
-        refine_landmarks=True,
-        min_detection_confidence=0.5,
-        min_tracking_confidence=0.5
-    )
-    mp_hands = mp.solutions.hands
-    hands = mp_hands.Hands(
-        max_num_hands=2,
-        min_detection_confidence=0.5,
-        min_tracking_confidence=0.5
-    )
-
-    hands_every = 3
-    last_hand_res = None
+    # 고개 포즈: 버퍼 전체를 (N, 14) 한 번의 predict로 → HeadPose/Gaze가 공유
+    with timer.stage("pose_predict"):
+        poses = pose_estimator.predict_batch(buffer.landmarks)
 
-    frame_idx = 0
-    last_sec = -1
-    max_time = 0.0
+    # 센터 보정 (고개/시선): 버퍼의 첫 CALIB_SECS초 포즈 평균
+    start_time = stats["start_time"]
+    if start_time is not None:
+        with timer.stage("calibration"):
+            calib_poses = poses[buffer.window(start_time, start_time + CALIB_SECS)]
+            calibrate_from_poses(calib_poses, (head_pose.calibrate_center, gaze.calibrate_center), "HeadPose+Gaze")
 
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-        frame_idx += 1
+    with timer.stage("head_pose"):
+        head_pose.replay(poses, buffer.timestamps)
+    with timer.stage("gaze"):
+        gaze.replay(buffer.landmarks, poses, w, h, buffer.timestamps)
 
-        # POS_MSEC 기반 시간
-        timestamp_ms = cap.get(cv2.CAP_PROP_POS_MSEC)
-        if timestamp_ms <= 0:   # fallback
-            t_sec = frame_idx / 30.0
-        else:
-            t_sec = timestamp_ms / 1000.0
-        max_time = max(max_time, t_sec)
-
-        # FaceMesh 처리
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        face_results = face_mesh.process(rgb)
-        if not face_results.multi_face_landmarks:
-            continue
-
-        landmarks_obj = face_results.multi_face_landmarks[0].landmark
-        landmarks_xy = {i: (landmarks_obj[i].x * w, landmarks_obj[i].y * h) for i in range(len(landmarks_obj))}
-
-        if (frame_idx % hands_every) == 0:
-            last_hand_res = hands.process(rgb)
-        hand_lms = (last_hand_res.multi_hand_landmarks if (last_hand_res and last_hand_res.multi_hand_landmarks) else None)
-
-        blink.process(landmarks_xy, t_sec)
-        gaze.process(landmarks_obj, w, h, t_sec)
-        face_touch.process(landmarks_xy, hand_lms, w, h, t_sec)
-        head_pose.process(landmarks_obj, t_sec)
-
-    cap.release()
-    face_mesh.close()
-    hands.close()
-    cv2.destroyAllWindows()
+    scoring_start = time.perf_counter()
 
     # duration은 POS_MSEC 기반으로 계산
+    max_time = stats["max_time"]
     total_secs = max(1.0, round(max_time))
     print("[DURATION]", "max_time:", max_time, "used total_secs:", total_secs)
 
@@ -234,6 +265,7 @@ def run_all_analyses(video_path):
         mm, ss = e["time"].split(":")
         return int(mm) * 60 + int(ss)
     timestamps.sort(key=key_ts)
+    timer.add("scoring", time.perf_counter() - scoring_start)
 
     return {
         "text": text_summary.strip(),
@@ -241,55 +273,404 @@ def run_all_analyses(video_path):
         "eyeScore":   gaze_res["score"],
         "headScore":  head_res["score"],
         "handScore":  hand_res["score"],
-        "timestamp":  timestamps
-    }, None
+        "timestamp":  timestamps,
+        "timings":    timer.as_dict()
+    }
+
+def _tap_full_resolution(frames, tap, max_side, timer):
+    """원본 해상도 프레임을 tap에 먼저 흘린 뒤(tap 안의 인코딩은 emotion_sample 단계) 분석 해상도로 축소"""
+    for frame, t_sec in tap(timer.iterate("decode", frames), timer):
+        with timer.stage("decode"):
+            frame = resize_max_side(frame, max_side)
+        yield frame, t_sec
+
+def run_all_analyses(video_path, mode=None, use_pipe=False, timer=None, meta=None, tap=None):
+    """
+    tap: 디코딩된 (프레임, t_sec) 스트림을 감싸는 함수 (예: emotion용 샘플 프레임 수집) — tap(frames, timer)
+    - tap이 있으면 원본 해상도로 디코딩해 tap에 넘기고, tracking용으로만 max_side까지 축소
+      (emotion 얼굴 검출이 단독 /analyze와 같은 해상도에서 돌도록. 대신 balanced/fast에서 디코딩 비용 증가)
+    """
+    timer = timer or StageTimer()
+    if meta is None:
+        with timer.stage("probe"):
+            meta = probe_video(video_path)
+        if meta is None:
+            return None, "영상 열기 실패"
+    # 분석 모드: 목표 fps + 분석 해상도
+    mode, mode_cfg = resolve_analysis_mode(mode)
+    decode_cfg = {**mode_cfg, "max_side": None} if tap is not None else mode_cfg
+    with timer.stage("decode"):
+        opened, error = (open_pipe_frames if use_pipe else open_capture_frames)(video_path, decode_cfg, meta)
+        if error and not use_pipe:
+            # ffprobe는 읽었는데 OpenCV가 못 여는 코덱 → 파이프로 재시도
+            print("[PIPE] OpenCV open failed → decode via ffmpeg rawvideo pipe")
+            use_pipe = True
+            opened, error = open_pipe_frames(video_path, decode_cfg, meta)
+    if error:
+        return None, error
+    frames, w, h, analysis_fps = opened
+    print("[MODE]", f"mode={mode} pipe={use_pipe} analysis_fps={analysis_fps:.2f} max_side={mode_cfg['max_side']}")
+    if tap is not None:
+        frames = _tap_full_resolution(frames, tap, mode_cfg["max_side"], timer)
+
+    buffer, stats = extract_features(frames, w, h, analysis_fps, timer, timed=tap is not None)
+    cv2.destroyAllWindows()
+
+    if stats["frames"] == 0:
+        return None, "프레임 읽기 실패(코덱/파일 문제 가능)"
+
+    return score_features(buffer, stats, w, h, analysis_fps, timer), None
+
+def extract_segment(video_path, mode, use_pipe, meta, start_sec, end_sec):
+    """
+    병렬 구간 분석의 워커 단위: [start_sec, end_sec) 구간만 디코딩 + 특징 추출
+    - 반환: ((buffer, stats, w, h, analysis_fps), None) 또는 (None, 에러 메시지)
+    """
+    timer = StageTimer()
+    mode, mode_cfg = resolve_analysis_mode(mode)
+    with timer.stage("decode"):
+        opened, error = (open_pipe_frames if use_pipe else open_capture_frames)(video_path, mode_cfg, meta, start_sec, end_sec)
+    if error:
+        return None, error
+    frames, w, h, analysis_fps = opened
+    print("[SEGMENT]", f"{start_sec:.1f}~{end_sec:.1f}s mode={mode} pipe={use_pipe}")
+
+    buffer, stats = extract_features(frames, w, h, analysis_fps, timer)
+    stats["timings"] = timer.as_dict()
+    return (buffer.trim(), stats, w, h, analysis_fps), None
+
+def merge_segments(segments, timer=None):
+    """
+    구간별 추출 결과를 이어 붙여 한 번의 순차 판정으로 점수 계산
+    - 구간별 decode/FaceMesh/Hands 시간은 합산 (워커들이 동시에 쓴 시간의 합이라 벽시계 시간보다 큼)
+    """
+    timer = timer or StageTimer()
+    for seg in segments:
+        timer.merge(seg[1].get("timings"))
+    _, _, w, h, analysis_fps = segments[0]
+    buffer = LandmarkBuffer.concatenate([seg[0] for seg in segments])
+    starts = [seg[1]["start_time"] for seg in segments if seg[1]["start_time"] is not None]
+    stats = {
+        "frames": sum(seg[1]["frames"] for seg in segments),
+        "start_time": min(starts) if starts else None,
+        "max_time": max(seg[1]["max_time"] for seg in segments),
+    }
+    if stats["frames"] == 0:
+        return None, "프레임 읽기 실패(코덱/파일 문제 가능)"
+    return score_features(buffer, stats, w, h, analysis_fps, timer), None
+
+def plan_segments(meta):
+    """병렬 분석할 구간 목록 [(start, end), ...]. 길이를 모르거나 짧으면 None(순차 분석)"""
+    duration = meta["duration"]
+    if not duration:
+        return None
+
+    count = min(WORKERS, int(duration // SEGMENT_MIN_SECS))
+    if count < 2:
+        return None
+    bounds = np.linspace(0.0, duration, count + 1)
+    bounds[-1] = duration + 1.0  # 마지막 구간은 끝까지 (길이 메타 오차 보정)
+    return [(float(bounds[i]), float(bounds[i + 1])) for i in range(count)]
+
+def analyze_video_file(src_path, mode=None, meta=None, tap=None):
+    """
+    업로드된 영상 하나를 분석 (프로세스 풀 워커에서 실행)
+    - meta: 호출 측에서 probe_video로 한 번 조회한 메타 (없으면 여기서 조회)
+    - 메타가 비정상이면 ffmpeg 파이프로 디코딩 (또는 설정에 따라 변환)
+    - 변환 파일은 여기서 정리, 원본(src_path)은 호출 측에서 정리
+    """
+    timer = StageTimer()
+    use_path = src_path
+    use_pipe = False
+    try:
+        if meta is None:
+            with timer.stage("probe"):
+                meta = probe_video(src_path)
+            if meta is None:
+                return None, "영상 열기 실패"
+        if probe_needs_transcode(meta):
+            if DECODE_MODE == "transcode":
+                print("[TRANSCODE] abnormal meta → convert to h264 mp4")
+                with timer.stage("transcode"):
+                    use_path = transcode_to_mp4(src_path)
+                with timer.stage("probe"):
+                    meta = probe_video(use_path)
+                if meta is None:
+                    return None, "영상 열기 실패"
+            else:
+                print("[PIPE] abnormal meta → decode via ffmpeg rawvideo pipe")
+                use_pipe = True
+
+        return run_all_analyses(use_path, mode, use_pipe, timer, meta, tap)
+    finally:
+        if use_path != src_path:
+            try:
+                if os.path.exists(use_path): os.remove(use_path)
+            except: pass
+
+def analyze_video_file_with_frames(src_path, mode=None, meta=None):
+    """
+    /analyze-all 워커 단위: tracking 분석을 하면서 같은 디코딩 스트림에서 emotion용 샘플 프레임도 수집
+    - 반환: (result, error, npz 바이트)
+    """
+    sampler = FrameBundleSampler(EMOTION_SAMPLE_FPS)
+    result, error = analyze_video_file(src_path, mode, meta, sampler.tap)
+    if error:
+        return None, error, None
+    print("[ANALYZE_ALL]", f"emotion frames={len(sampler)}")
+    return result, None, sampler.to_npz()
+
+async def analyze_upload(src_path, mode=None, parallel=False, content_hash=None):
+    """
+    업로드 하나 분석 (이벤트 루프에서 호출)
+    - parallel이고 영상이 충분히 길면: 구간별 특징 추출을 워커들에 분배 → 이어 붙여 한 번에 판정
+    - 아니면: 워커 하나에서 순차 분석
+    - content_hash가 있으면 (내용 해시 + 분석 파라미터) 키로 결과 캐시 조회/저장
+      같은 키가 이미 분석 중이면 새로 분석하지 않고 그 결과를 기다림
+    - 결과의 단계별 소요 시간은 /metrics 히스토그램에 기록
+    """
+    key = None
+    if content_hash and result_cache.enabled:
+        t0 = time.perf_counter()
+        key = make_cache_key(content_hash, mode=resolve_analysis_mode(mode)[0], parallel=bool(parallel), decode=DECODE_MODE)
+        cached = await asyncio.to_thread(result_cache.get, key)
+        if cached is not None:
+            print("[CACHE] hit", key[:12])
+            timings = {"cache": round(time.perf_counter() - t0, 4)}
+            observe_timings(timings)
+            return {**cached, "timings": timings}, None
+        pending = _inflight.get(key)
+        if pending is not None:
+            print("[CACHE] join in-flight", key[:12])
+            result, error = await asyncio.shield(pending)
+            if result is None:
+                return None, error
+            # 먼저 온 요청이 같은 dict에 자기 timings를 쓰므로 복사본 + 이 요청이 기다린 시간만 반환
+            timings = {"inflight_wait": round(time.perf_counter() - t0, 4)}
+            observe_timings(timings)
+            return {**result, "timings": timings}, None
+
+    # 캐시 미스 → await 전에 바로 in-flight 등록 (거의 동시에 온 같은 영상도 이 task를 기다리도록 ffprobe까지 task 안에서)
+    task = asyncio.ensure_future(_probe_and_analyze(src_path, mode, parallel))
+    if key:
+        _inflight[key] = task
+    try:
+        result, error = await asyncio.shield(task)
+        if result is not None:
+            observe_timings(result.get("timings"))
+            print("[TIMINGS]", result.get("timings"))
+            if key:
+                # 캐시에 들어간 뒤에 in-flight에서 빼야 그 사이에 온 같은 영상이 다시 분석되지 않음
+                await asyncio.to_thread(result_cache.put, key, {k: v for k, v in result.items() if k != "timings"})
+    finally:
+        if key and _inflight.get(key) is task:
+            del _inflight[key]
+    return result, error
+
+async def _probe_and_analyze(src_path, mode, parallel):
+    # 메타 조회는 요청당 ffprobe 한 번 (디코딩 없음) → 길이 제한 / 디코딩 경로 / 구간 계획에 같이 사용
+    t0 = time.perf_counter()
+    meta = await asyncio.to_thread(probe_video, src_path)
+    probe_secs = time.perf_counter() - t0
+    if meta is None:
+        return None, "영상 열기 실패"
+    check_duration(meta["duration"])
+
+    result, error = await _analyze_upload(src_path, mode, parallel, meta)
+    if result is not None:
+        result["timings"] = {"probe": round(probe_secs, 4), **result.get("timings", {})}
+    return result, error
+
+async def _analyze_upload(src_path, mode, parallel, meta):
+    if parallel:
+        needs_transcode = probe_needs_transcode(meta)
+        if not (needs_transcode and DECODE_MODE == "transcode"):
+            use_pipe = needs_transcode
+            segments = plan_segments(meta)
+            if segments:
+                print("[PARALLEL]", f"segments={len(segments)} pipe={use_pipe}")
+                admit(len(segments))  # 구간 일부만 거절되지 않도록 한 번에 예약
+                parts = await asyncio.gather(*(
+                    run_in_pool(extract_segment, src_path, mode, use_pipe, meta, start, end, admitted=True)
+                    for start, end in segments
+                ))
+                for _, error in parts:
+                    if error:
+                        return None, error
+                return await asyncio.to_thread(merge_segments, [part for part, _ in parts])
+
+    return await run_in_pool(analyze_video_file, src_path, mode, meta)
+
+def build_response(interviewId, seq, result, timings=False):
+    # 응답 형식 통일
+    response = {
+        "interviewId": interviewId,
+        "seq": seq,
+        "text": result["text"],
+        "blinkScore": result["blinkScore"],
+        "eyeScore": result["eyeScore"],
+        "headScore": result["headScore"],
+        "handScore": result["handScore"],
+        "timestamp": result["timestamp"]
+    }
+    # 요청 시에만 단계별 소요 시간(초) 포함
+    if timings:
+        response["meta"] = {"timings": result.get("timings", {})}
+    return response
 
 @app.get("/healthz")
 def healthz():
     return {"ok": True}
 
+@app.get("/metrics")
+def metrics():
+    # Prometheus 텍스트 형식
+    return PlainTextResponse(render_metrics({"tracking_pool": pool_stats()}), media_type="text/plain; version=0.0.4")
+
+def overloaded_response(e: PoolOverloaded):
+    return JSONResponse(content={"error": str(e)}, status_code=503, headers={"Retry-After": "10"})
+
 @app.post("/tracking")
 async def analyze_tracking(
     file: UploadFile = File(...),
     interviewId: str = Form(...),
-    seq: int = Form(...)
+    seq: int = Form(...),
+    mode: str | None = Form(None),   # 분석 모드(full/balanced/fast), 없으면 TRACKING_ANALYSIS_MODE
+    parallel: bool | None = Form(None),   # 긴 영상 구간 병렬 분석, 없으면 TRACKING_PARALLEL
+    timings: bool = Form(False),   # true면 응답 meta.timings에 단계별 소요 시간 포함
 ):
     try:
-        # 1) 원본 저장 (확장자 유지)
-        orig_ext = os.path.splitext(file.filename or "")[1].lower() or ".bin"
-        src_path = f"temp_{uuid.uuid4()}{orig_ext}"
-        with open(src_path, "wb") as f: shutil.copyfileobj(file.file, f)
-
-        use_path = src_path
-        # 2) 메타/타임스탬프 이상하면 무조건 변환
-        if probe_needs_transcode(src_path):
-            print("[TRANSCODE] abnormal meta/pos_msec → convert to h264 mp4")
-            use_path = transcode_to_mp4(src_path)
-
-        # 3) 분석
-        result, error = run_all_analyses(use_path)
-
-        # 4) 정리
-        for p in {src_path, use_path}:
-            try:
-                if p and os.path.exists(p): os.remove(p)
-            except: pass
+        resolve_analysis_mode(mode)
+    except ValueError as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
 
+    t0 = time.perf_counter()
+    try:
+        # 1) 원본 저장 (tmpfs 우선, 요청이 끝나면 예외가 나도 삭제)
+        async with saved_upload(file) as (src_path, content_hash):
+            # 2) 분석 (프로세스 풀에서 실행 → 이벤트 루프/헬스체크는 계속 응답, 같은 영상이면 캐시 결과)
+            result, error = await analyze_upload(src_path, mode, PARALLEL_DEFAULT if parallel is None else parallel, content_hash)
         if error:
             return JSONResponse(content={"error": error}, status_code=400)
 
-        # 3. 응답 형식 통일
+        REQUEST_SECONDS.observe("/tracking", time.perf_counter() - t0)
+        return build_response(interviewId, seq, result, timings)
+
+    except UploadRejected as e:
+        return JSONResponse(content={"error": str(e)}, status_code=413)
+    except PoolOverloaded as e:
+        return overloaded_response(e)
+    except Exception as e:
+        print("[TRACKING_ERR]", str(e))
+        return JSONResponse(status_code=500, content={"error": str(e)})
+
+@app.post("/analyze-all")
+async def analyze_all(
+    file: UploadFile = File(...),
+    interviewId: str = Form(...),
+    seq: int = Form(...),
+    mode: str | None = Form(None),
+    timings: bool = Form(False),
+):
+    """
+    tracking + emotion 통합 분석: 영상은 여기서 한 번만 업로드/디코딩
+    - tracking 판정과 함께 초당 3장 샘플 프레임을 JPEG 묶음으로 모아 emotion /analyze-frames로 전달
+    - emotion 호출이 실패해도 tracking 결과는 그대로 반환하고 emotion에 error를 담음
+    """
+    try:
+        resolve_analysis_mode(mode)
+    except ValueError as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
+
+    t0 = time.perf_counter()
+    try:
+        async with saved_upload(file) as (src_path, _):
+            meta = await asyncio.to_thread(probe_video, src_path)
+            if meta is None:
+                return JSONResponse(content={"error": "영상 열기 실패"}, status_code=400)
+            check_duration(meta["duration"])
+            result, error, bundle = await run_in_pool(analyze_video_file_with_frames, src_path, mode, meta)
+        if error:
+            return JSONResponse(content={"error": error}, status_code=400)
+        observe_timings(result.get("timings"))
+
+        try:
+            emotion = await asyncio.to_thread(analyze_frames_remote, bundle, interviewId, seq, meta["duration"])
+        except RuntimeError as e:
+            print("[EMOTION_ERR]", str(e))
+            emotion = {"error": str(e)}
+
+        REQUEST_SECONDS.observe("/analyze-all", time.perf_counter() - t0)
         return {
             "interviewId": interviewId,
             "seq": seq,
-            "text": result["text"],
-            "blinkScore": result["blinkScore"],
-            "eyeScore": result["eyeScore"],
-            "headScore": result["headScore"],
-            "handScore": result["handScore"],
-            "timestamp": result["timestamp"]
+            "tracking": build_response(interviewId, seq, result, timings),
+            "emotion": emotion,
         }
 
+    except UploadRejected as e:
+        return JSONResponse(content={"error": str(e)}, status_code=413)
+    except PoolOverloaded as e:
+        return overloaded_response(e)
     except Exception as e:
-        print("[TRACKING_ERR]", str(e))
-        return JSONResponse(status_code=500, content={"error": str(e)})
\ No newline at end of file
+        print("[ANALYZE_ALL_ERR]", str(e))
+        return JSONResponse(status_code=500, content={"error": str(e)})
+
+# ---------------------------------------------
+# 비동기 작업 API: 제출 → jobId 반환 → 폴링 또는 콜백으로 결과 수신
+# ---------------------------------------------
+async def _run_job(job_id, src_path, content_hash, interviewId, seq, mode, parallel, callback_url, timings=False):
+    t0 = time.perf_counter()
+    try:
+        result, error = await analyze_upload(src_path, mode, parallel, content_hash)
+        if error:
+            jobs.update(job_id, status="failed", error=error)
+        else:
+            REQUEST_SECONDS.observe("/tracking/jobs", time.perf_counter() - t0)
+            jobs.update(job_id, status="done", result=build_response(interviewId, seq, result, timings))
+    except Exception as e:
+        print("[TRACKING_JOB_ERR]", job_id, str(e))
+        jobs.update(job_id, status="failed", error=str(e))
+    finally:
+        await asyncio.to_thread(remove_file, src_path)
+
+    if callback_url:
+        await asyncio.to_thread(post_callback, callback_url, jobs.get(job_id))
+
+@app.post("/tracking/jobs", status_code=202)
+async def submit_tracking_job(
+    file: UploadFile = File(...),
+    interviewId: str = Form(...),
+    seq: int = Form(...),
+    mode: str | None = Form(None),
+    parallel: bool | None = Form(None),
+    callbackUrl: str | None = Form(None),   # 완료 시 작업 상태(JSON)를 POST할 URL (선택)
+    timings: bool = Form(False),
+):
+    try:
+        resolve_analysis_mode(mode)
+    except ValueError as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
+
+    # 대기열이 이미 가득 차 있으면 업로드를 저장하기 전에 거절
+    if is_overloaded():
+        return overloaded_response(PoolOverloaded("분석 대기열이 가득 찼습니다. 잠시 후 다시 시도하세요."))
+
+    try:
+        src_path, content_hash = await asyncio.to_thread(save_upload, file)   # 작업이 끝날 때 _run_job에서 삭제
+    except UploadRejected as e:
+        return JSONResponse(content={"error": str(e)}, status_code=413)
+    job_id = jobs.create(interviewId=interviewId, seq=seq)
+    task = asyncio.create_task(_run_job(
+        job_id, src_path, content_hash, interviewId, seq, mode, PARALLEL_DEFAULT if parallel is None else parallel, callbackUrl, timings
+    ))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return {"jobId": job_id, "status": "pending"}
+
+@app.get("/tracking/jobs/{job_id}")
+def get_tracking_job(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        return JSONResponse(content={"error": "작업을 찾을 수 없습니다."}, status_code=404)
+    return job
@@ -0,0 +1,39 @@
+import os
+
+# 분석 모드별 설정
+# - fps: 분석 목표 fps (None이면 원본 fps 그대로, 원본보다 높으면 원본 사용)
+# - max_side: 분석용 프레임의 긴 변 최대 픽셀 (None이면 원본 해상도)
+ANALYSIS_MODES = {
+    "full":     {"fps": None, "max_side": None},  # 기존 동작 (전체 프레임, 원본 해상도)
+    "balanced": {"fps": 15.0, "max_side": 640},
+    "fast":     {"fps": 10.0, "max_side": 480},   # 피크 시간대 처리량 우선
+}
+
+DEFAULT_ANALYSIS_MODE = os.getenv("TRACKING_ANALYSIS_MODE", "full")
+
+# full 모드의 프레임 수 임계값 기준 fps (기존처럼 원본 fps와 상관없이 30fps 기준 프레임 수)
+BASELINE_FPS = 30.0
+
+
+def resolve_analysis_mode(name: str | None = None) -> tuple[str, dict]:
+    """요청 값(없으면 환경변수 기본값)으로 분석 모드 확정. 모르는 이름이면 ValueError"""
+    mode = (name or DEFAULT_ANALYSIS_MODE).strip().lower()
+    if mode not in ANALYSIS_MODES:
+        raise ValueError(f"지원하지 않는 분석 모드입니다: {mode} (가능: {', '.join(ANALYSIS_MODES)})")
+    return mode, ANALYSIS_MODES[mode]
+
+
+def threshold_fps(mode_cfg: dict, analysis_fps: float) -> float:
+    """
+    깜빡임/시선/터치 연속 프레임 기준과 Hands 간격을 환산할 fps
+    - full: 기존과 같은 프레임 수(깜빡임 3, 시선 5, 터치 15, Hands 3프레임) → 24/60fps 영상도 점수가 기존과 같음
+    - 그 외: 실제 분석 fps (프레임 간격 분석에서도 같은 시간 기준으로 판정)
+    """
+    return BASELINE_FPS if mode_cfg["fps"] is None else analysis_fps
+
+
+def frame_stride(native_fps: float, target_fps: float | None) -> int:
+    """원본 fps → 목표 fps로 줄이기 위한 프레임 간격 (1이면 전체 프레임)"""
+    if not target_fps or native_fps <= target_fps:
+        return 1
+    return max(1, int(round(native_fps / target_fps)))
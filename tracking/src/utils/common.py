@@ -1,4 +1,8 @@
 def sec_to_timestamp(sec: float) -> str:
     s = int(sec)
     m, s = divmod(s, 60)
-    return f"{m:02d}:{s:02d}"
\ No newline at end of file
+    return f"{m:02d}:{s:02d}"
+
+def secs_to_frames(secs: float, fps: float) -> int:
+    """초 단위 임계값 → 현재 분석 fps 기준 프레임 수 (최소 1)"""
+    return max(1, int(round(secs * fps)))
@@ -0,0 +1,50 @@
+import io
+import time
+import cv2
+import numpy as np
+
+# /analyze-all에서 emotion 서버(/analyze-frames)로 넘기는 샘플 프레임 묶음 (npz, pickle 없음)
+# - timestamps: (N,) float64 초
+# - offsets:    (N+1,) int64 — jpeg[offsets[i]:offsets[i+1]]가 i번째 프레임
+# - jpeg:       (총 바이트,) uint8 — JPEG 인코딩 프레임을 이어 붙인 것
+
+
+class FrameBundleSampler:
+    """
+    tracking 분석용 프레임 스트림에 끼워서 초당 sample_fps장만 JPEG로 모아두는 tap
+    - 영상은 tracking 쪽에서 한 번만 디코딩하고 emotion은 이 묶음만 받아 검출/분류
+    - emotion 서버의 샘플링 규칙(직전 샘플과 1/sample_fps초 이상 차이)과 동일
+    """
+
+    def __init__(self, sample_fps: float = 3, jpeg_quality: int = 90):
+        self.interval = 1.0 / sample_fps
+        self.jpeg_quality = jpeg_quality
+        self._timestamps = []
+        self._chunks = []
+        self._prev = None
+
+    def __len__(self):
+        return len(self._timestamps)
+
+    def tap(self, frames, timer=None):
+        """(BGR 프레임, t_sec) 스트림을 그대로 흘려보내면서 샘플 프레임만 인코딩해 보관 (timer: emotion_sample 단계)"""
+        for frame, t_sec in frames:
+            if self._prev is None or t_sec - self._prev >= self.interval:
+                t0 = time.perf_counter()
+                ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+                if timer is not None:
+                    timer.add("emotion_sample", time.perf_counter() - t0)
+                if ok:
+                    self._prev = t_sec
+                    self._timestamps.append(t_sec)
+                    self._chunks.append(buf.reshape(-1))
+            yield frame, t_sec
+
+    def to_npz(self) -> bytes:
+        sizes = [len(c) for c in self._chunks]
+        offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=offsets[1:])
+        jpeg = np.concatenate(self._chunks) if self._chunks else np.empty(0, dtype=np.uint8)
+        out = io.BytesIO()
+        np.savez(out, timestamps=np.asarray(self._timestamps, dtype=np.float64), offsets=offsets, jpeg=jpeg)
+        return out.getvalue()
@@ -0,0 +1,64 @@
+import threading
+import mediapipe as mp
+from src.head_detection.pose_estimator import HeadPoseEstimator
+
+# 워커(프로세스/스레드)별로 한 번만 만들어서 요청마다 재사용
+# - MediaPipe 그래프는 스레드 안전하지 않으므로 threading.local로 분리
+# - model.pkl은 읽기 전용이라 프로세스당 1개를 HeadPose/Gaze가 공유
+_local = threading.local()
+_estimator = None
+_estimator_lock = threading.Lock()
+
+
+def get_face_mesh():
+    face_mesh = getattr(_local, "face_mesh", None)
+    if face_mesh is None:
+        face_mesh = mp.solutions.face_mesh.FaceMesh(
+            max_num_faces=1,
+            refine_landmarks=True,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
+        _local.face_mesh = face_mesh
+    return face_mesh
+
+
+def get_hands():
+    hands = getattr(_local, "hands", None)
+    if hands is None:
+        hands = mp.solutions.hands.Hands(
+            max_num_hands=2,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
+        _local.hands = hands
+    return hands
+
+
+def discard_graphs():
+    """그래프가 비정상 상태일 수 있을 때(분석 중 예외) 닫고 다음 요청에서 새로 생성"""
+    for name in ("face_mesh", "hands"):
+        graph = getattr(_local, name, None)
+        if graph is not None:
+            try:
+                graph.close()
+            except Exception:
+                pass
+            setattr(_local, name, None)
+
+
+def get_pose_estimator() -> HeadPoseEstimator:
+    global _estimator
+    if _estimator is None:
+        with _estimator_lock:
+            if _estimator is None:
+                _estimator = HeadPoseEstimator()
+    return _estimator
+
+
+def warmup():
+    """워커 시작 시 그래프/모델을 미리 초기화 (ProcessPoolExecutor initializer)"""
+    get_face_mesh()
+    get_hands()
+    get_pose_estimator()
+    print("[WORKER] mediapipe graphs / head pose model ready")
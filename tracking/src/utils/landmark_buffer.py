@@ -0,0 +1,86 @@
+import numpy as np
+
+NUM_FACE_LANDMARKS = 478  # FaceMesh(refine_landmarks=True) 기준 랜드마크 수
+
+
+def landmarks_to_array(landmarks) -> np.ndarray:
+    """FaceMesh landmark 리스트 → (478, 2) float32 정규화 좌표 배열"""
+    n = len(landmarks)
+    flat = np.fromiter((v for lm in landmarks for v in (lm.x, lm.y)), dtype=np.float32, count=n * 2)
+    return flat.reshape(n, 2)
+
+
+class LandmarkBuffer:
+    """
+    프레임별 얼굴 랜드마크를 (N, 478, 2) float32 배열 + 타임스탬프(N,)로 모아두는 버퍼
+    - 좌표는 FaceMesh 정규화 좌표(0~1) 그대로 저장 (픽셀 변환은 각 모듈에서 w, h로)
+    - touching(N,): 그 프레임에서 손이 얼굴에 닿았는지 (Hands 결과는 프레임 단위로만 필요해서 여부만 저장)
+    - 용량은 2배씩 늘려서 append 비용을 상수 시간으로 유지
+    """
+
+    def __init__(self, capacity: int = 1024, num_landmarks: int = NUM_FACE_LANDMARKS):
+        capacity = max(int(capacity), 1)
+        self._landmarks = np.empty((capacity, num_landmarks, 2), dtype=np.float32)
+        self._timestamps = np.empty(capacity, dtype=np.float64)
+        self._touching = np.zeros(capacity, dtype=bool)
+        self._size = 0
+
+    @classmethod
+    def concatenate(cls, buffers):
+        """구간별 버퍼를 시간순으로 이어 붙임 (병렬 구간 분석 결과 병합용)"""
+        buffers = sorted((b for b in buffers if len(b)), key=lambda b: b.timestamps[0])
+        merged = cls(capacity=sum(len(b) for b in buffers))
+        for b in buffers:
+            n, m = merged._size, len(b)
+            merged._landmarks[n:n + m] = b.landmarks
+            merged._timestamps[n:n + m] = b.timestamps
+            merged._touching[n:n + m] = b.touching
+            merged._size += m
+        return merged
+
+    def __len__(self):
+        return self._size
+
+    def _grow(self):
+        capacity = max(self._landmarks.shape[0] * 2, 1)
+        landmarks = np.empty((capacity,) + self._landmarks.shape[1:], dtype=np.float32)
+        timestamps = np.empty(capacity, dtype=np.float64)
+        touching = np.zeros(capacity, dtype=bool)
+        landmarks[:self._size] = self._landmarks[:self._size]
+        timestamps[:self._size] = self._timestamps[:self._size]
+        touching[:self._size] = self._touching[:self._size]
+        self._landmarks, self._timestamps, self._touching = landmarks, timestamps, touching
+
+    def trim(self):
+        """남는 용량을 잘라냄 (프로세스 간 전달 전 pickle 크기 줄이기)"""
+        self._landmarks = self._landmarks[:self._size].copy()
+        self._timestamps = self._timestamps[:self._size].copy()
+        self._touching = self._touching[:self._size].copy()
+        return self
+
+    def append(self, landmarks: np.ndarray, t_sec: float, touching: bool = False):
+        if self._size == self._landmarks.shape[0]:
+            self._grow()
+        self._landmarks[self._size] = landmarks
+        self._timestamps[self._size] = t_sec
+        self._touching[self._size] = touching
+        self._size += 1
+
+    @property
+    def landmarks(self) -> np.ndarray:
+        return self._landmarks[:self._size]
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._timestamps[:self._size]
+
+    @property
+    def touching(self) -> np.ndarray:
+        return self._touching[:self._size]
+
+    def window(self, start_sec: float, end_sec: float) -> slice:
+        """start_sec ≤ t ≤ end_sec 구간의 인덱스 slice (타임스탬프는 증가 순서라고 가정)"""
+        ts = self.timestamps
+        lo = int(np.searchsorted(ts, start_sec, side="left"))
+        hi = int(np.searchsorted(ts, end_sec, side="right"))
+        return slice(lo, hi)
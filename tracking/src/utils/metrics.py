@@ -0,0 +1,114 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# 단계별 소요 시간 히스토그램 버킷(초) — 짧은 감지 모듈부터 긴 영상의 decode/FaceMesh까지
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+
+class StageTimer:
+    """
+    요청 하나의 단계별 소요 시간(초) 누적
+    - 같은 단계를 여러 번 재면 합산 (프레임마다 도는 FaceMesh/Hands 등)
+    - 워커 프로세스에서 잰 값은 as_dict()로 넘겨받아 merge()로 합침
+    """
+
+    def __init__(self):
+        self._secs = {}
+
+    def add(self, stage: str, secs: float):
+        self._secs[stage] = self._secs.get(stage, 0.0) + secs
+
+    @contextmanager
+    def stage(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - t0)
+
+    def iterate(self, name: str, iterable):
+        """iterable에서 다음 항목을 꺼내는 데 걸린 시간을 name 단계로 누적 (디코딩 제너레이터 측정용)"""
+        it = iter(iterable)
+        while True:
+            t0 = time.perf_counter()
+            try:
+                item = next(it)
+            except StopIteration:
+                self.add(name, time.perf_counter() - t0)
+                return
+            self.add(name, time.perf_counter() - t0)
+            yield item
+
+    def merge(self, timings: dict):
+        for stage, secs in (timings or {}).items():
+            self.add(stage, secs)
+
+    def as_dict(self) -> dict:
+        return {stage: round(secs, 4) for stage, secs in self._secs.items()}
+
+
+class Histogram:
+    """Prometheus 형식 히스토그램 (라벨 1개). 외부 의존성 없이 /metrics 텍스트로 출력"""
+
+    def __init__(self, name: str, help_text: str, label: str, buckets=STAGE_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.buckets = tuple(buckets)
+        self._series = {}  # label 값 → [bucket별 count..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, label_value: str, value: float):
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_value, series in sorted(self._series.items()):
+                label = f'{self.label}="{label_value}"'
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f'{self.name}_bucket{{{label},le="{bound:g}"}} {count}')
+                lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {series[len(self.buckets)]}')
+                lines.append(f"{self.name}_sum{{{label}}} {series[-1]:.6f}")
+                lines.append(f"{self.name}_count{{{label}}} {series[len(self.buckets)]}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "tracking_stage_seconds", "Time spent per analysis stage (summed over segments in parallel mode)", "stage"
+)
+REQUEST_SECONDS = Histogram("tracking_request_seconds", "End-to-end analysis time per request", "endpoint")
+
+
+def observe_timings(timings: dict):
+    for stage, secs in (timings or {}).items():
+        STAGE_SECONDS.observe(stage, secs)
+
+
+def render_gauges(prefix: str, values: dict) -> list[str]:
+    """{이름: 값} → Prometheus gauge/counter 줄 (이름이 _total로 끝나면 counter)"""
+    lines = []
+    for key, value in values.items():
+        name = f"{prefix}_{key}"
+        lines.append(f"# TYPE {name} {'counter' if key.endswith('_total') else 'gauge'}")
+        lines.append(f"{name} {value}")
+    return lines
+
+
+def render_metrics(gauges: dict | None = None) -> str:
+    """gauges: {prefix: {이름: 값}} — 분석 풀 대기열 등 요청 시점의 상태값"""
+    lines = []
+    for metric in (STAGE_SECONDS, REQUEST_SECONDS):
+        lines.extend(metric.render())
+    for prefix, values in (gauges or {}).items():
+        lines.extend(render_gauges(prefix, values))
+    return "\n".join(lines) + "\n"
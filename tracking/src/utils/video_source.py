@@ -0,0 +1,160 @@
+import cv2
+import json
+import numpy as np
+import subprocess
+import tempfile
+
+
+def scaled_size(w: int, h: int, max_side: int | None) -> tuple[int, int]:
+    """긴 변이 max_side를 넘지 않도록 비율 유지한 (w, h)"""
+    if not max_side or max(w, h) <= max_side:
+        return w, h
+    scale = max_side / float(max(w, h))
+    return max(1, int(round(w * scale))), max(1, int(round(h * scale)))
+
+
+def resize_max_side(frame, max_side: int | None):
+    """긴 변이 max_side보다 크면 비율 유지하며 축소 (랜드마크는 정규화 좌표라 원본 기준 그대로 사용 가능)"""
+    h, w = frame.shape[:2]
+    size = scaled_size(w, h, max_side)
+    if size == (w, h):
+        return frame
+    return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+
+def iter_capture_frames(cap, stride: int = 1, max_side: int | None = None, fallback_fps: float = 30.0,
+                        start_sec: float = 0.0):
+    """
+    cv2.VideoCapture → (BGR 프레임, t_sec) 제너레이터
+    - stride: N프레임마다 1장만 분석. 건너뛰는 프레임은 grab()만 하고 retrieve()(BGR 변환)는 생략
+    - max_side: 분석용 해상도 제한
+    - start_sec: cap을 이 시각으로 seek한 경우 (구간 분석). 프레임 번호를 영상 전체 기준으로 이어서 셈
+      → stride 위상과 fallback 시각이 순차 분석과 같음
+    - t_sec: POS_MSEC 기반, 값이 없으면 frame_idx / fallback_fps (frame_idx는 영상 전체 기준)
+    """
+    frame_idx = int(round(start_sec * fallback_fps))
+    while True:
+        if not cap.grab():
+            break
+        frame_idx += 1
+        if (frame_idx - 1) % stride:
+            continue
+
+        ok, frame = cap.retrieve()
+        if not ok or frame is None:
+            break
+
+        timestamp_ms = cap.get(cv2.CAP_PROP_POS_MSEC)
+        if timestamp_ms <= 0:   # fallback
+            t_sec = frame_idx / fallback_fps
+        else:
+            t_sec = timestamp_ms / 1000.0
+        yield resize_max_side(frame, max_side), t_sec
+
+
+def _parse_rate(rate: str | None) -> float:
+    """ffprobe 프레임레이트 문자열("30000/1001", "0/0") → float (알 수 없으면 0.0)"""
+    try:
+        num, _, den = (rate or "").partition("/")
+        return float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+
+
+def probe_video(path: str) -> dict | None:
+    """
+    ffprobe 한 번으로 컨테이너/스트림 메타 조회 (프레임 디코딩 없음). 비디오 스트림이 없거나 실패 시 None
+    - width/height: 회전 메타(90/270도)가 있으면 디코딩 결과 기준으로 뒤바꾼 값
+    - fps: avg_frame_rate(없으면 r_frame_rate), 알 수 없으면 0.0
+    - duration: 컨테이너 길이(초), 브라우저 webm처럼 길이 정보가 없으면 None
+    - frames: 스트림 프레임 수 메타, 없으면 None
+    """
+    cmd = [
+        "ffprobe", "-v", "error", "-select_streams", "v:0",
+        "-show_entries", "stream=codec_name,width,height,avg_frame_rate,r_frame_rate,nb_frames"
+                         ":stream_tags=rotate:stream_side_data=rotation:format=format_name,duration",
+        "-of", "json", path
+    ]
+    cp = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    try:
+        info = json.loads(cp.stdout or "{}")
+        stream = info["streams"][0]
+        w, h = int(stream["width"]), int(stream["height"])
+    except (ValueError, KeyError, IndexError, TypeError):
+        print("[FFPROBE_ERR]", (cp.stderr or "")[:500])
+        return None
+    if w <= 0 or h <= 0:
+        return None
+
+    rotation = stream.get("tags", {}).get("rotate") or next(
+        (sd.get("rotation") for sd in stream.get("side_data_list", []) if "rotation" in sd), 0
+    )
+    try:
+        if int(float(rotation)) % 180:
+            w, h = h, w
+    except (TypeError, ValueError):
+        pass
+
+    fmt = info.get("format", {})
+    try:
+        duration = float(fmt.get("duration") or 0.0)
+    except ValueError:
+        duration = 0.0
+    try:
+        frames = int(stream.get("nb_frames") or 0)
+    except ValueError:
+        frames = 0
+
+    return {
+        "width": w,
+        "height": h,
+        "fps": _parse_rate(stream.get("avg_frame_rate")) or _parse_rate(stream.get("r_frame_rate")),
+        "duration": duration if duration > 0 else None,
+        "frames": frames or None,
+        "codec": stream.get("codec_name"),
+        "format": fmt.get("format_name"),
+    }
+
+
+def iter_ffmpeg_frames(path: str, fps: float, out_size: tuple[int, int],
+                       start_sec: float = 0.0, duration: float | None = None):
+    """
+    ffmpeg 디코딩 결과를 rawvideo(bgr24)로 stdout 파이프에서 바로 읽는 (BGR 프레임, t_sec) 제너레이터
+    - libx264로 재인코딩 → 다시 디코딩하는 왕복 없이 webm 등을 바로 분석
+    - fps 필터로 고정 fps, scale 필터로 분석 해상도까지 ffmpeg에서 처리
+    - start_sec/duration: 구간만 디코딩 (병렬 구간 분석용)
+    - t_sec는 고정 fps 기준으로 합성 (start_sec + frame_idx / fps)
+    """
+    ow, oh = out_size
+    seek = ["-ss", f"{start_sec:.3f}"] if start_sec > 0 else []
+    limit = ["-t", f"{duration:.3f}"] if duration else []
+    cmd = [
+        "ffmpeg", "-nostdin", "-v", "error", *seek, *limit, "-i", path,
+        "-an", "-vf", f"fps={fps},scale={ow}:{oh}",
+        "-f", "rawvideo", "-pix_fmt", "bgr24", "pipe:1"
+    ]
+    frame_bytes = ow * oh * 3
+    # stderr는 임시파일로 (파이프로 두면 에러 로그가 많을 때 stdout 읽는 중에 막힐 수 있음)
+    with tempfile.TemporaryFile() as err_file:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=err_file, bufsize=frame_bytes)
+        frame_idx = 0
+        finished = False
+        try:
+            while True:
+                buf = proc.stdout.read(frame_bytes)
+                if len(buf) < frame_bytes:
+                    break
+                frame = np.frombuffer(buf, dtype=np.uint8).reshape(oh, ow, 3)
+                yield frame, start_sec + frame_idx / fps
+                frame_idx += 1
+            finished = True
+        finally:
+            if not finished and proc.poll() is None:
+                proc.kill()  # 소비 측에서 중단한 경우
+            proc.stdout.close()
+            proc.wait()
+
+        if proc.returncode != 0 and frame_idx == 0:
+            err_file.seek(0)
+            print("[FFMPEG_ERR]", err_file.read().decode(errors="replace")[:500])
+            raise RuntimeError("ffmpeg 디코딩 실패")